@@ -20,9 +20,9 @@ class FirebaseToken(BaseModel):
     token: str
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
-    # Simple JWT decode for now
+    # JWT decode (recently verified tokens are served from the claims cache)
     try:
-        payload = security.jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = security.decode_access_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -89,7 +89,7 @@ async def signup(user: UserCreate):
     if user_crud.get_by_email(user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_pw = security.get_password_hash(user.password)
+    hashed_pw = await security.aget_password_hash(user.password)
     user_data = user.dict()
     user_data.pop("password")
     user_data["created_at"] = datetime.utcnow() # type: ignore
@@ -112,8 +112,13 @@ async def login(user: UserLogin):
     if not user_data:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
-    if not security.verify_password(user.password, user_data.get("password_hash")):
+    hashed_pw = user_data.get("password_hash")
+    if not hashed_pw or not await security.averify_password(user.password, hashed_pw):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+
+    # Upgrade hashes made with an older BCRYPT_ROUNDS while we have the plain password
+    if security.password_needs_rehash(hashed_pw):
+        user_crud.update(user.email, {"password_hash": await security.aget_password_hash(user.password)})
         
     access_token = security.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -29,27 +29,19 @@ async def generate_certificate(language: str, level: str, current_user: UserBase
          raise HTTPException(status_code=400, detail="Learning path is empty.")
          
     # Check status of ALL topics
-    # We need to fetch progress for each topic
-    # Optimization: Maybe store 'isCompleted' on the path doc itself when last topic is mastered?
-    # For now, iterate (max 10-20 topics, acceptable overhead)
-    
-    all_mastered = True
-    # RELAXED CHECK FOR TESTING: 
-    # Just checking if topics exist. In production, uncomment the check below.
-    # for topic in topics:
-    #     t_id_raw = topic.get("id") or topic.get("title")
-    #     t_id = str(t_id_raw)
-    #     
-    #     progress = topic_progress.get_progress(user_email, t_id)
-    #     status = progress.get("status") if progress else "NOT_ATTEMPTED"
-    #     
-    #     if status != "MASTERED":
-    #         all_mastered = False
-    #         break
+    # Progress for every topic is fetched in one batched read (same IDs as quiz submission)
+    unique_ids = [f"{language}_{topic.get('id') or topic.get('title')}" for topic in topics]
+    progress_map = topic_progress.get_progress_bulk(user_email, unique_ids, field_paths=["status"])
+    all_mastered = all(
+        progress_map.get(t_id, {}).get("status") == TopicStatus.MASTERED
+        for t_id in unique_ids
+    )
             
-    # if not all_mastered:
-    #    # raise HTTPException(status_code=400, detail="You must MASTER all topics in this course to earn a certificate.")
-    #    pass # Allow for demo
+    # RELAXED CHECK FOR TESTING: 
+    # In production, enforce mastery instead of just logging it.
+    if not all_mastered:
+       # raise HTTPException(status_code=400, detail="You must MASTER all topics in this course to earn a certificate.")
+       print(f"DEBUG: Certificate issued to {user_email} without full mastery (demo mode)")
         
     # 2. Generate PDF
     course_display_name = f"{language.capitalize()} {level.capitalize()} Course"
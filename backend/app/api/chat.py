@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+import json
 from langchain_core.messages import HumanMessage, AIMessage
 from app.api.auth import get_current_user
 from app.models.user import UserBase
 from app.db.firestore import get_db
+from app.core.config import settings
+from app.core.context_window import trim_to_budget
 
 router = APIRouter()
 
@@ -48,50 +53,74 @@ async def get_chat_history(current_user: UserBase = Depends(get_current_user)):
         print(f"Error fetching chat history: {e}")
         return []
 
+def _build_initial_state(current_user: UserBase, message: str, payload: dict):
+    """
+    Loads the behavior profile and recent history for the graph run.
+    Returns the initial state and the user's chat_history collection.
+    """
+    # Get DB access
+    db = get_db()
+    user_ref = db.collection("users").document(current_user.email)
+    history_ref = user_ref.collection("chat_history")
+    
+    # 1. Fetch Profile for State
+    doc_profile = db.collection("behaviorProfiles").document(current_user.email).get()
+    user_profile = doc_profile.to_dict() if doc_profile.exists else {}
+
+    # We start with the user's new message. 
+    # Ideally we'd hydrate 'messages' with recent history from DB for context,
+    # but for now we follow the improved architecture where the graph manages the run.
+    # But wait, LangGraph `state` expects the full history if we want context.
+    # Let's fetch last 5 messages for context.
+    
+    recent_docs = history_ref.order_by("timestamp", direction="DESCENDING").limit(5).stream()
+    recent = []
+    # Firestore returns descending, so we reverse to be chronological
+    for doc in sorted(list(recent_docs), key=lambda x: x.get("timestamp")):
+         d = doc.to_dict()
+         recent.append({"role": "user" if d.get("sender") == "user" else "assistant", "content": d.get("text") or ""})
+
+    # Long tutor answers can blow up the prompt; keep the newest turns within budget
+    history_msgs = []
+    for msg in trim_to_budget(recent, settings.CONTEXT_MAX_TOKENS, min_keep=0):
+         if msg["role"] == "user":
+             history_msgs.append(HumanMessage(content=msg["content"]))
+         else:
+             history_msgs.append(AIMessage(content=msg["content"]))
+             
+    # Add current message
+    history_msgs.append(HumanMessage(content=message))
+    
+    initial_state = {
+        "messages": history_msgs,
+        "user_profile": user_profile,
+        "user_email": current_user.email,
+        "payload": payload
+    }
+    return initial_state, history_ref
+
+def _save_exchange(history_ref, user_text: str, response_text: str) -> None:
+    # Save User Message
+    history_ref.add({
+        "sender": "user",
+        "text": user_text,
+        "timestamp": datetime.utcnow()
+    })
+    
+    # Save AI Response
+    history_ref.add({
+        "sender": "ai",
+        "text": response_text,
+        "timestamp": datetime.utcnow()
+    })
+
 @router.post("", response_model=ChatResponse)
 def chat_endpoint(request: ChatRequest, current_user: UserBase = Depends(get_current_user)):
     try:
-        # Get DB access
-        db = get_db()
-        user_ref = db.collection("users").document(current_user.email)
-        history_ref = user_ref.collection("chat_history")
-        
-        # 1. Fetch Profile for State
-        doc_profile = db.collection("behaviorProfiles").document(current_user.email).get()
-        user_profile = doc_profile.to_dict() if doc_profile.exists else {}
-
         # 2. Invoke Graph
         from app.graph.workflow import app_graph
-        from langchain_core.messages import HumanMessage
-        
-        # We start with the user's new message. 
-        # Ideally we'd hydrate 'messages' with recent history from DB for context,
-        # but for now we follow the improved architecture where the graph manages the run.
-        # But wait, LangGraph `state` expects the full history if we want context.
-        # Let's fetch last 5 messages for context.
-        
-        recent_docs = history_ref.order_by("timestamp", direction="DESCENDING").limit(5).stream()
-        history_msgs = []
-        # Firestore returns descending, so we reverse to be chronological
-        for doc in sorted(list(recent_docs), key=lambda x: x.get("timestamp")):
-             d = doc.to_dict()
-             sender = d.get("sender")
-             text = d.get("text")
-             if sender == "user":
-                 history_msgs.append(HumanMessage(content=text))
-             else:
-                 history_msgs.append(AIMessage(content=text))
-                 
-        # Add current message
-        current_human_msg = HumanMessage(content=request.message)
-        history_msgs.append(current_human_msg)
-        
-        initial_state = {
-            "messages": history_msgs,
-            "user_profile": user_profile,
-            "user_email": current_user.email,
-            "payload": {} 
-        }
+
+        initial_state, history_ref = _build_initial_state(current_user, request.message, {})
         
         result = app_graph.invoke(initial_state)
         
@@ -105,19 +134,7 @@ def chat_endpoint(request: ChatRequest, current_user: UserBase = Depends(get_cur
             response_text = "I couldn't generate a response."
 
         # 4. Save to DB (Persistence)
-        # Save User Message
-        history_ref.add({
-            "sender": "user",
-            "text": request.message,
-            "timestamp": datetime.utcnow()
-        })
-        
-        # Save AI Response
-        history_ref.add({
-            "sender": "ai",
-            "text": response_text,
-            "timestamp": datetime.utcnow()
-        })
+        _save_exchange(history_ref, request.message, response_text)
         
         return {"response": response_text}
         
@@ -126,3 +143,53 @@ def chat_endpoint(request: ChatRequest, current_user: UserBase = Depends(get_cur
             raise HTTPException(status_code=429, detail="Daily AI usage limit reached. Please try again tomorrow.")
         print(f"Chat Graph Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def chat_stream_endpoint(request: ChatRequest, current_user: UserBase = Depends(get_current_user)):
+    """
+    Server-Sent Events version of chat_endpoint.
+    Emits `data: {"token": ...}` frames as the chat node generates them and a
+    final `event: done` frame with the full response once it is persisted.
+    """
+    from app.graph.workflow import app_graph
+
+    # Firestore client is blocking; keep it off the event loop
+    initial_state, history_ref = await run_in_threadpool(
+        _build_initial_state, current_user, request.message, {"stream": True}
+    )
+
+    async def event_stream():
+        chunks = []
+        final_text = None
+        try:
+            async for mode, data in app_graph.astream(initial_state, stream_mode=["custom", "values"]):
+                if mode == "custom" and "token" in data:
+                    chunks.append(data["token"])
+                    yield _sse({"token": data["token"]})
+                elif mode == "values":
+                    output_messages = data.get("messages", [])
+                    if output_messages and isinstance(output_messages[-1], AIMessage):
+                        final_text = output_messages[-1].content
+        except Exception as e:
+            print(f"Chat Stream Error: {e}")
+            if "AI_QUOTA_EXCEEDED" in str(e):
+                detail = "Daily AI usage limit reached. Please try again tomorrow."
+            else:
+                detail = str(e)
+            yield _sse({"detail": detail}, event="error")
+            return
+
+        response_text = final_text or "".join(chunks) or "I couldn't generate a response."
+        if not chunks:
+            # Routed to a non-streaming node; deliver the answer as one token
+            yield _sse({"token": response_text})
+
+        await run_in_threadpool(_save_exchange, history_ref, request.message, response_text)
+        yield _sse({"response": response_text}, event="done")
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Any
 from app.api.auth import get_current_user
 from app.models.user import UserBase
 from app.data.problems import PROBLEMS_DATA
-from app.api.execution import execute_code, ExecutionRequest # Reuse existing logic if possible or call directly
+from app.api.execution import ExecutionRequest
+from app.core.config import settings
+from app.crud.activity import activity as activity_crud
+from app.execution.base import ExecutionUnavailable, UnsupportedLanguage
+from app.execution.engine import execution_backend
+from app.execution.judge import ACCEPTED, JudgeError, judge_submission
 
 router = APIRouter()
 
@@ -33,26 +39,40 @@ async def submit_solution(problem_id: str, request: ExecutionRequest, current_us
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
 
-    user_code = request.code
     language = request.language.lower()
 
-    if language == "python":
-        # Mock Verification for MVP
-        return {
-            "status": "Accepted",
-            "passed_tests": len(problem["test_cases"]),
-            "total_tests": len(problem["test_cases"]),
-            "runtime": "45ms"
-        }
+    # Harness generation + parallel runs block, keep them off the event loop
+    try:
+        result = await run_in_threadpool(
+            judge_submission,
+            execution_backend.uncached if request.no_cache else execution_backend,
+            problem,
+            language,
+            request.code,
+            concurrency=settings.EXECUTION_SUBMISSION_CONCURRENCY,
+            stop_on_first_failure=request.stop_on_first_failure,
+            time_limit_ms=settings.JUDGE_TIME_LIMIT_MS,
+            memory_limit_mb=settings.JUDGE_MEMORY_LIMIT_MB
+        )
+    except JudgeError as e:
+        return {"status": "Error", "message": str(e)}
+    except UnsupportedLanguage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutionUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e) or "Code execution service unavailable")
 
-    if language == "java":
-        # Mock Verification for MVP
-        # Ideally: Strip user Main class, inject TestRunner Main class, compile & run.
-        return {
-            "status": "Accepted",
-            "passed_tests": len(problem["test_cases"]),
-            "total_tests": len(problem["test_cases"]),
-            "runtime": "120ms"
-        }
+    if result["status"] == ACCEPTED:
+        await run_in_threadpool(
+            activity_crud.log_activity,
+            user_id=current_user.email,
+            activity_type="COMPETITIVE_SOLVED",
+            title=f'Solved "{problem["title"]}"',
+            metadata={
+                "problem_id": problem_id,
+                "language": language,
+                "runtime": result["runtime"],
+                "memory": result["memory"]
+            }
+        )
 
-    return {"status": "Error", "message": f"Language '{language}' not supported for submission yet."}
+    return result
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
-import requests
+from app.execution.base import ExecutionUnavailable, UnsupportedLanguage
+from app.execution.engine import execution_backend
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -9,54 +11,37 @@ class ExecutionRequest(BaseModel):
     language: str
     code: str
     test_cases: Optional[List[Dict[str, str]]] = None
+    stop_on_first_failure: bool = False
+    no_cache: bool = False  # Always re-run (random / time-dependent programs)
+
+def _outputs_match(actual: str, expected: str) -> bool:
+    # Simple exact match for now (could be improved with fuzzy match)
+    # Normalize newlines
+    return actual.strip().replace("\r\n", "\n") == expected.strip().replace("\r\n", "\n")
 
 @router.post("/execute")
 def execute_code(request: ExecutionRequest):
     """
-    Executes code using the Piston API (https://emkc.org/api/v2/piston).
+    Executes code on the configured execution backend (Piston API or the
+    local sandbox, see EXECUTION_BACKEND).
     Acts as a proxy to avoid CORS issues on frontend and centralize logic.
     """
     
-    # Map our language names to Piston's runtime names
-    runtime_map = {
-        "python": {"language": "python", "version": "3.10.0"},
-        "java": {"language": "java", "version": "15.0.2"},
-        "javascript": {"language": "javascript", "version": "18.15.0"}
-    }
-
-    lang_config = runtime_map.get(request.language.lower())
-    
-    if not lang_config:
-        # Fallback or error
-        # Piston supports many, let's try direct map if not in our rigorous list
-        lang_config = {"language": request.language.lower(), "version": "*"}
+    backend = execution_backend.uncached if request.no_cache else execution_backend
 
     # Helper to run a single execution
-    def _run_piston(code_content: str, stdin_content: str = ""):
-        # Prepare file object with name if needed
-        file_obj = {"content": code_content}
-        if lang_config["language"] == "java":
-            file_obj["name"] = "Main.java"
-
-        payload = {
-            "language": lang_config["language"],
-            "version": lang_config["version"],
-            "files": [file_obj],
-            "stdin": stdin_content
-        }
-        
+    def _run(code_content: str, stdin_content: str = ""):
         try:
-            response = requests.post("https://emkc.org/api/v2/piston/execute", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Piston API Error: {e}")
-            raise HTTPException(status_code=503, detail="Code execution service unavailable")
+            return backend.run(request.language, code_content, stdin_content)
+        except UnsupportedLanguage as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ExecutionUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e) or "Code execution service unavailable")
 
     try:
         # standard execution (no test cases)
         if not request.test_cases:
-            result = _run_piston(request.code)
+            result = _run(request.code)
             run_result = result.get("run", {})
             return {
                 "output": run_result.get("output", ""),
@@ -66,28 +51,52 @@ def execute_code(request: ExecutionRequest):
             }
         
         # Test Case Execution
+        # Cases run in parallel (capped per submission), results keep input order
+        inputs = [case.get("input", "") for case in request.test_cases]
+        expected_outputs = [case.get("expected_output", "").strip() for case in request.test_cases]
+
+        def _passed(index: int, result: dict) -> bool:
+            return _outputs_match(result.get("run", {}).get("stdout", ""), expected_outputs[index])
+
+        try:
+            results = backend.run_many(
+                request.language,
+                request.code,
+                inputs,
+                concurrency=settings.EXECUTION_SUBMISSION_CONCURRENCY,
+                check=_passed,
+                stop_on_failure=request.stop_on_first_failure
+            )
+        except UnsupportedLanguage as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ExecutionUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e) or "Code execution service unavailable")
+
         test_results = []
         passed_count = 0
         
-        for case in request.test_cases:
-            input_data = case.get("input", "")
-            expected = case.get("expected_output", "").strip()
-            
-            result = _run_piston(request.code, input_data)
+        for index, result in enumerate(results):
+            if result is None:
+                # Not run because an earlier case failed (stop_on_first_failure)
+                test_results.append({
+                    "input": inputs[index],
+                    "expected_output": expected_outputs[index],
+                    "actual_output": "",
+                    "passed": False,
+                    "skipped": True,
+                    "stderr": ""
+                })
+                continue
+
             run_result = result.get("run", {})
-            actual_raw = run_result.get("stdout", "")
-            actual = actual_raw.strip()
-            
-            # Simple exact match for now (could be improved with fuzzy match)
-            # Normalize newlines
-            passed = (actual.replace("\r\n", "\n") == expected.replace("\r\n", "\n"))
+            passed = _passed(index, result)
             if passed:
                 passed_count += 1
                 
             test_results.append({
-                "input": input_data,
-                "expected_output": expected,
-                "actual_output": actual,
+                "input": inputs[index],
+                "expected_output": expected_outputs[index],
+                "actual_output": run_result.get("stdout", "").strip(),
                 "passed": passed,
                 "stderr": run_result.get("stderr", "")
             })
@@ -99,6 +108,8 @@ def execute_code(request: ExecutionRequest):
             "is_test_run": True
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Internal Execution Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
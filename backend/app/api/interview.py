@@ -1,22 +1,30 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import uuid
 from app.graph.workflow import app_graph
 from langchain_core.messages import HumanMessage, AIMessage
+from app.core.session_store import interview_sessions
+from app.core.context_window import interview_window
+from app.api.auth import get_current_user
+from app.models.user import UserBase
 
 class InterviewContext(BaseModel):
     topic: str
     difficulty: str
     history: List[Dict[str, str]] = []
+    # Rolling summary of history[:summarized_upto], reused across turns
+    summary: str = ""
+    summarized_upto: int = 0
+    # Owner; LLM tokens for the session are charged to this user's budget
+    user_email: str = ""
 
 router = APIRouter()
 # agent = InterviewAgent() - Removed logic
 
-
-# In-memory session store for MVP
-# In production, use Redis or Database
-sessions: Dict[str, InterviewContext] = {}
+# Sessions live in the configured SessionStore (memory, SQLite or Redis)
+# so they expire and can be shared across uvicorn workers.
 
 class StartInterviewRequest(BaseModel):
     topic: str
@@ -34,7 +42,7 @@ class MessageResponse(BaseModel):
     message: str
 
 @router.post("/start", response_model=StartResponse)
-async def start_interview(req: StartInterviewRequest):
+async def start_interview(req: StartInterviewRequest, current_user: UserBase = Depends(get_current_user)):
     session_id = str(uuid.uuid4())
     
     # Generate opening message via Graph
@@ -46,10 +54,10 @@ async def start_interview(req: StartInterviewRequest):
         },
         "messages": [],
         "user_profile": {},
-        "user_email": "guest_interviewer"
+        "user_email": current_user.email
     }
     
-    result = app_graph.invoke(graph_input)
+    result = await app_graph.ainvoke(graph_input)
     # The InterviewNode adds the response to messages
     if result["messages"]:
         opening_message = result["messages"][-1].content
@@ -61,25 +69,35 @@ async def start_interview(req: StartInterviewRequest):
     context = InterviewContext(
         topic=req.topic,
         difficulty=req.difficulty,
+        user_email=current_user.email,
         history=[
             {"role": "assistant", "content": opening_message}
         ]
     )
-    sessions[session_id] = context
+    await run_in_threadpool(interview_sessions.set, session_id, context.dict())
     
     return StartResponse(session_id=session_id, message=opening_message)
 
 @router.post("/chat", response_model=MessageResponse)
-async def chat_interview(req: InterviewMessageRequest):
+async def chat_interview(req: InterviewMessageRequest, current_user: UserBase = Depends(get_current_user)):
     session_id = req.session_id
-    if session_id not in sessions:
+    session_data = await run_in_threadpool(interview_sessions.get, session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    context = sessions[session_id]
+    context = InterviewContext(**session_data)
+    if context.user_email and context.user_email != current_user.email:
+        raise HTTPException(status_code=404, detail="Session not found")
     
+    # Older turns are folded into the session's rolling summary so the prompt
+    # stays flat; only the recent window is replayed verbatim.
+    window = await interview_window.aprepare(context.history, context.summary, context.summarized_upto, user=current_user.email)
+    context.summary = window.summary
+    context.summarized_upto = window.summarized_upto
+
     # Reconstruct history for LangGraph
     history_msgs = []
-    for msg in context.history:
+    for msg in window.recent:
         if msg["role"] == "user":
             history_msgs.append(HumanMessage(content=msg["content"]))
         else:
@@ -96,17 +114,19 @@ async def chat_interview(req: InterviewMessageRequest):
         "messages": history_msgs,
         "payload": {
              "interview_topic": context.topic, # Force routing to interview node
-             "difficulty": context.difficulty
+             "difficulty": context.difficulty,
+             "history_summary": context.summary
         },
         "user_profile": {},
-        "user_email": "guest_interviewer"
+        "user_email": current_user.email
     }
     
-    result = app_graph.invoke(graph_input)
+    result = await app_graph.ainvoke(graph_input)
     ai_response = result["messages"][-1].content if result["messages"] else "..."
     
     # Update history
     context.history.append({"role": "user", "content": req.message})
     context.history.append({"role": "assistant", "content": ai_response})
+    await run_in_threadpool(interview_sessions.set, session_id, context.dict())
     
     return MessageResponse(message=ai_response)
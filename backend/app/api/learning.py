@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 # from google.cloud import firestore # access via Model or CRUD
@@ -6,14 +7,27 @@ from app.api.auth import get_current_user
 from app.models.user import UserBase
 from app.graph.workflow import app_graph
 from app.crud.learning import learning_path, topic_progress
+from app.crud.progress_summary import progress_summary
 from app.crud.psychometric import psychometric_profile
 from app.crud.content import static_content, topic_quiz
 from app.models.enums import TopicStatus
 from datetime import datetime
 from app.data.static_content import TOPIC_DATA # Local fallback
+from app.core.rate_limit import quota_governor, LLMPriority
 
 router = APIRouter()
 
+QUOTA_WARNING_BANNER = """
+# 🛑 Daily AI Quota Exceeded
+
+**You have reached your daily AI usage limit.** 
+We cannot generate a personalized lesson for you right now. Below is the standard lesson context. 
+The Code Examples and Quiz are still available!
+
+---
+
+"""
+
 class QuizResultItem(BaseModel):
     questionId: int
     question: str
@@ -109,6 +123,7 @@ def get_learning_path(language: str, level: str, current_user: UserBase = Depend
         print(f"DEBUG: Found {len(topics)} topics")
         
         # Fetch statuses
+        unique_ids = []
         for topic in topics:
             # We must use the same ID logic as the frontend/quiz submission
             # Quiz submission uses topic_id from URL, which seems to be "1", "2" etc.
@@ -121,8 +136,12 @@ def get_learning_path(language: str, level: str, current_user: UserBase = Depend
                 t_id = topic.get("title") 
                 
             # Use Unique ID for progress
-            unique_t_id = f"{language}_{t_id}"
-            progress = topic_progress.get_progress(user_email, unique_t_id)
+            unique_ids.append(f"{language}_{t_id}")
+
+        # One batched read for every topic instead of a round trip per topic
+        progress_map = topic_progress.get_progress_bulk(user_email, unique_ids, field_paths=["status"])
+        for topic, unique_t_id in zip(topics, unique_ids):
+            progress = progress_map.get(unique_t_id)
             if progress:
                 topic["status"] = progress.get("status", TopicStatus.NOT_ATTEMPTED)
             else:
@@ -147,6 +166,59 @@ async def reset_learning_path(language: str, level: str, current_user: UserBase
     else:
         raise HTTPException(status_code=404, detail="Path not found")
 
+def _format_activity(activity: Dict[str, Any]) -> Dict[str, str]:
+    # Format an activity for frontend with icon, color and relative time
+    activity_type = activity.get("activity_type", "")
+    title = activity.get("title", "Unknown Activity")
+    timestamp = activity.get("timestamp", "")
+    
+    # Determine icon and color based on activity type
+    if activity_type == "TOPIC_COMPLETED":
+        icon = "✅"
+        color = "bg-green-500"
+    elif activity_type == "TOPIC_PRACTICING":
+        icon = "📚"
+        color = "bg-orange-500"
+    elif activity_type == "TOPIC_STARTED":
+        icon = "🚀"
+        color = "bg-purple-500"
+    elif activity_type == "COMPETITIVE_SOLVED":
+        icon = "💻"
+        color = "bg-blue-500"
+    elif activity_type == "INTERVIEW_COMPLETED":
+        icon = "🎤"
+        color = "bg-pink-500"
+    elif activity_type == "DIAGNOSTIC_TAKEN":
+        icon = "🧠"
+        color = "bg-indigo-500"
+    else:
+        icon = "📝"
+        color = "bg-gray-500"
+    
+    # Calculate time ago
+    try:
+        updated_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        now = datetime.utcnow()
+        delta = now - updated_time.replace(tzinfo=None)
+        
+        if delta.days > 0:
+            time_ago = f"{delta.days} day{'s' if delta.days > 1 else ''} ago"
+        elif delta.seconds >= 3600:
+            hours = delta.seconds // 3600
+            time_ago = f"{hours} hour{'s' if hours > 1 else ''} ago"
+        else:
+            minutes = delta.seconds // 60
+            time_ago = f"{minutes} minute{'s' if minutes > 1 else ''} ago" if minutes > 0 else "Just now"
+    except:
+        time_ago = "Recently"
+    
+    return {
+        "title": title,
+        "time": time_ago,
+        "icon": icon,
+        "color": color
+    }
+
 @router.get("/dashboard/summary")
 async def get_dashboard_summary(current_user: UserBase = Depends(get_current_user)):
     # Dynamic Progress Calculation
@@ -158,25 +230,15 @@ async def get_dashboard_summary(current_user: UserBase = Depends(get_current_use
     if total_topics == 0: total_topics = 30 # Fallback 15 python + 15 java
 
     # 2. Get user's mastered topics
-    # We need to query topic_progress for this user. 
-    # Since topic_progress is a collection, we can query by user_id and status.
-    # But crud might not have count method exposed directly.
-    # Let's use direct firestore for efficiency or add method to crud.
-    from app.db.firestore import get_db
-    db = get_db()
-    progress_ref = db.collection("topicProgress") # CamelCase to match CRUD
-    
-    # Simple query should work now if we check for both Enum/String
-    # But let's stick to the robust iteration since we know data is there.
-    all_progress_query = progress_ref.where("user_id", "==", current_user.email)
-    docs = list(all_progress_query.stream())
-    
-    mastered_count = 0
-    for d in docs:
-        data = d.to_dict()
-        status = data.get("status")
-        if status == "MASTERED" or status == TopicStatus.MASTERED or status == "TopicStatus.MASTERED":
-            mastered_count += 1
+    # Single read of the per-user aggregate (maintained on quiz submission).
+    # Users that predate it get it rebuilt from topicProgress once.
+    summary = progress_summary.get_summary(current_user.email)
+    if summary is None:
+        summary = progress_summary.rebuild(current_user.email)
+    
+    mastered_count = summary.get("totals", {}).get("mastered", 0)
+    last_language = summary.get("lastLanguage") or "python"
+    current_topic = summary.get("lastTopicTitle") or "Python Basics"
             
     progress_percent = int((mastered_count / total_topics) * 100) if total_topics > 0 else 0
     
@@ -195,65 +257,13 @@ async def get_dashboard_summary(current_user: UserBase = Depends(get_current_use
     activities_data = activity_crud.get_recent_activities(current_user.email, limit=6)
     
     # Format activities for frontend with icons and colors
-    recent_activities = []
-    for activity in activities_data:
-        activity_type = activity.get("activity_type", "")
-        title = activity.get("title", "Unknown Activity")
-        timestamp = activity.get("timestamp", "")
-        
-        # Determine icon and color based on activity type
-        if activity_type == "TOPIC_COMPLETED":
-            icon = "✅"
-            color = "bg-green-500"
-        elif activity_type == "TOPIC_PRACTICING":
-            icon = "📚"
-            color = "bg-orange-500"
-        elif activity_type == "TOPIC_STARTED":
-            icon = "🚀"
-            color = "bg-purple-500"
-        elif activity_type == "COMPETITIVE_SOLVED":
-            icon = "💻"
-            color = "bg-blue-500"
-        elif activity_type == "INTERVIEW_COMPLETED":
-            icon = "🎤"
-            color = "bg-pink-500"
-        elif activity_type == "DIAGNOSTIC_TAKEN":
-            icon = "🧠"
-            color = "bg-indigo-500"
-        else:
-            icon = "📝"
-            color = "bg-gray-500"
-        
-        # Calculate time ago
-        from datetime import datetime
-        try:
-            updated_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            now = datetime.utcnow()
-            delta = now - updated_time.replace(tzinfo=None)
-            
-            if delta.days > 0:
-                time_ago = f"{delta.days} day{'s' if delta.days > 1 else ''} ago"
-            elif delta.seconds >= 3600:
-                hours = delta.seconds // 3600
-                time_ago = f"{hours} hour{'s' if hours > 1 else ''} ago"
-            else:
-                minutes = delta.seconds // 60
-                time_ago = f"{minutes} minute{'s' if minutes > 1 else ''} ago" if minutes > 0 else "Just now"
-        except:
-            time_ago = "Recently"
-        
-        recent_activities.append({
-            "title": title,
-            "time": time_ago,
-            "icon": icon,
-            "color": color
-        })
+    recent_activities = [_format_activity(a) for a in activities_data]
 
     return {
         "user_name": current_user.name,
         "progress_percent": progress_percent,
-        "current_topic": "Python Basics", # Could be dynamic based on last active
-        "selected_language": "Python", # Could be dynamic
+        "current_topic": current_topic,
+        "selected_language": last_language.capitalize(),
         "xp": xp,
         "streak": current_user.streak_count,
         "rank": rank,
@@ -261,12 +271,43 @@ async def get_dashboard_summary(current_user: UserBase = Depends(get_current_use
         "recent_activities": recent_activities
     }
 
+@router.get("/activity/feed")
+async def get_activity_feed(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: UserBase = Depends(get_current_user)
+):
+    """
+    Infinite-scroll activity feed. Pass `next_cursor` from the previous
+    response as `cursor` to get the following page.
+    """
+    from app.crud.activity import activity as activity_crud
+
+    limit = max(1, min(limit, 50))
+    activities_data, next_cursor = await run_in_threadpool(
+        activity_crud.get_activity_page, current_user.email, limit=limit, cursor=cursor
+    )
+    return {
+        "activities": [_format_activity(a) for a in activities_data],
+        "next_cursor": next_cursor
+    }
+
+@router.get("/ai/budget")
+async def get_ai_budget(current_user: UserBase = Depends(get_current_user)):
+    """
+    Remaining AI budget for the current user (per worker process).
+    """
+    budget = quota_governor.remaining(current_user.email)
+    budget["lessons_available"] = quota_governor.can_serve(LLMPriority.HIGH, current_user.email)
+    return budget
+
 # from app.agents.content_generation_agent import ContentGenerationAgent
 # from app.agents.evaluator_agent import EvaluatorAgent
 
 class QuizSubmission(BaseModel):
     submission: List[Dict[str, Any]]
     totalQuestions: int
+    level: Optional[str] = None # Roadmap level, used for per-level progress counts
 
 @router.get("/topic/{language}/{topic_id}")
 async def get_topic_details(language: str, topic_id: str, current_user: UserBase = Depends(get_current_user)):
@@ -307,7 +348,11 @@ async def get_topic_details(language: str, topic_id: str, current_user: UserBase
     content_to_show = static_text # Default
 
     # 3. Logic Flow
-    if status == TopicStatus.WEAK:
+    if status == TopicStatus.WEAK and not quota_governor.can_serve(LLMPriority.HIGH, user_email):
+        # Degrade up front instead of spending a round trip on a call that will be shed
+        print(f"Quota governor: serving static lesson for {user_email}")
+        content_to_show = QUOTA_WARNING_BANNER + static_text
+    elif status == TopicStatus.WEAK:
         # Fetch psychometric profile
         user_profile_doc = psychometric_profile.get_by_user(user_email)
         user_profile = user_profile_doc if user_profile_doc else {}
@@ -323,23 +368,17 @@ async def get_topic_details(language: str, topic_id: str, current_user: UserBase
                 "user_email": user_email,
                 "messages": []
             }
-            result_graph = app_graph.invoke(graph_input)
+            result_graph = await app_graph.ainvoke(graph_input)
             ai_content = result_graph.get("payload", {}).get("content", "")
             
-            content_to_show = ai_content
+            if ai_content == "AI_QUOTA_EXCEEDED":
+                # ContentNode signals quota errors through the payload
+                content_to_show = QUOTA_WARNING_BANNER + static_text
+            else:
+                content_to_show = ai_content
         except Exception as e:
             if "AI_QUOTA_EXCEEDED" in str(e):
-                warning_banner = """
-# 🛑 Daily AI Quota Exceeded
-
-**You have reached your daily AI usage limit.** 
-We cannot generate a personalized lesson for you right now. Below is the standard lesson context. 
-The Code Examples and Quiz are still available!
-
----
-
-"""
-                content_to_show = warning_banner + static_text
+                content_to_show = QUOTA_WARNING_BANNER + static_text
             else:
                 print(f"Content generation failed: {e}")
                 content_to_show = static_text  
@@ -378,7 +417,7 @@ async def submit_topic_quiz(
         "messages": []
     }
     
-    graph_result = app_graph.invoke(graph_input)
+    graph_result = await app_graph.ainvoke(graph_input)
     result = graph_result.get("payload", {})
     
     print(f"DEBUG: Graph result for {topic_id}: {result}")
@@ -391,29 +430,19 @@ async def submit_topic_quiz(
         new_status = TopicStatus.NOT_ATTEMPTED 
     
     unique_topic_id = f"{language}_{topic_id}"
-    curr_progress = topic_progress.get_progress(user_email, unique_topic_id)
-    attempts = curr_progress.get("attempts", 0) + 1 if curr_progress else 1
-    
-    doc_id = f"{user_email}_{unique_topic_id}"
-    update_data = {
-        "user_id": user_email,
-        "topic_id": unique_topic_id, 
-        "status": new_status,
-
-        "last_score": result.get("score"),
-        "attempts": attempts,
-        "updatedAt": datetime.utcnow().isoformat()
-    }
-    
-    print(f"DEBUG: Attempting to save progress: {update_data}")
-
-    # Determine if create or update
-    if curr_progress:
-        topic_progress.update(doc_id, update_data)
-        print("DEBUG: Updated existing progress doc")
-    else:
-        topic_progress.create(update_data, id=doc_id) # loose typing
-        print("DEBUG: Created new progress doc")
+    topic_title = TOPIC_DATA.get(language, {}).get(topic_id, {}).get("title") or unique_topic_id.replace("_", " ")
+    
+    # Progress doc and the per-user progressSummaries aggregate are written in one transaction
+    update_data = topic_progress.record_attempt(
+        user_email,
+        unique_topic_id,
+        language=language,
+        status=new_status,
+        score=result.get("score"),
+        topic_title=topic_title,
+        level=submission.level
+    )
+    print(f"DEBUG: Saved progress: {update_data}")
     
     # --- GAMIFICATION UPDATE ---
     from app.crud.user import user as user_crud
@@ -3,6 +3,7 @@ from typing import Optional, List
 from app.api.auth import get_current_user
 from app.models.user import UserBase, UserUpdate
 from app.db.firestore import get_db
+from app.crud.user import user as user_crud
 import shutil
 import os
 from pathlib import Path
@@ -27,6 +28,7 @@ async def update_user_me(user_update: UserUpdate, current_user: UserBase = Depen
     if update_data:
         print(f"DEBUG: Updating user {current_user.email} with data: {update_data}")
         user_ref.update(update_data)
+        user_crud.invalidate(current_user.email)
         
         # Determine the updated state
         updated_snapshot = user_ref.get()
@@ -55,5 +57,6 @@ async def upload_resume(file: UploadFile = File(...), current_user: UserBase = D
     
     db = get_db()
     db.collection("users").document(current_user.email).update({"resume_url": resume_url})
+    user_crud.invalidate(current_user.email)
     
     return {"resume_url": resume_url}
@@ -1,44 +1,117 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.core.llm import llm_client
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from app.api.auth import get_current_user
+from app.core.llm import async_llm_client
+from app.core.rate_limit import LLMPriority
+from app.core.config import settings
+from app.core.context_window import trim_to_budget
+from app.core.streaming import batch_chunks
+import asyncio
 import json
 
 router = APIRouter()
 
+def _parse_message(data: str):
+    # Simple protocol: Expect JSON {"message": "...", "history": [...]} or just raw text
+    # For this MVP, let's assume it sends a JSON string or raw text.
+    # {"type": "cancel"} aborts the response currently being streamed.
+    try:
+        payload = json.loads(data)
+        if isinstance(payload, dict):
+            return payload
+    except Exception:
+        pass
+    return {"message": data, "history": []}
+
+def _build_messages(history, user_message: str):
+    # The client owns the history, so cap it here the way the REST interview
+    # window does: only well-formed turns, the last few, within the token budget
+    if not isinstance(history, list):
+        history = []
+    turns = [
+        {"role": m["role"], "content": m["content"]}
+        for m in history
+        if isinstance(m, dict) and m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)
+    ]
+    recent = turns[-settings.CONTEXT_KEEP_MESSAGES:] if settings.CONTEXT_KEEP_MESSAGES > 0 else []
+    return trim_to_budget(recent + [{"role": "user", "content": user_message}], settings.CONTEXT_MAX_TOKENS)
+
+async def _stream_turn(websocket: WebSocket, messages, user: str):
+    stream = async_llm_client.astream_chat_completion(messages, user=user, priority=LLMPriority.HIGH)
+    frames = batch_chunks(
+        stream,
+        max_chars=settings.WS_STREAM_FLUSH_CHARS,
+        max_delay=settings.WS_STREAM_FLUSH_MS / 1000
+    )
+    try:
+        async for frame in frames:
+            await websocket.send_text(frame)
+    except WebSocketDisconnect:
+        raise
+    except Exception as e:
+        # Nothing is persisted here; tell the listener the answer was cut short
+        print(f"Interview stream failed: {e}")
+        await websocket.send_text(" Error generating response.")
+    finally:
+        await frames.aclose()
+
 @router.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
+async def websocket_endpoint(websocket: WebSocket, client_id: str, token: str = ""):
+    # Browsers cannot set headers on a WebSocket, so the JWT comes as ?token=.
+    # Turns are charged to this user's quota like the REST interview routes.
+    try:
+        current_user = await run_in_threadpool(get_current_user, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     await websocket.accept()
+    pending = None
+    turn = None
     try:
         while True:
             # Receive message from client
-            data = await websocket.receive_text()
-            
-            # Simple protocol: Expect JSON {"message": "...", "history": [...]} or just raw text
-            # For this MVP, let's assume it sends a JSON string or raw text.
-            try:
-                payload = json.loads(data)
-                user_message = payload.get("message", "")
-                history = payload.get("history", [])
-            except:
-                user_message = data
-                history = []
+            payload = pending or _parse_message(await websocket.receive_text())
+            pending = None
+            if payload.get("type") == "cancel":
+                # Nothing is streaming; acknowledge so the client can reset
+                await websocket.send_text("<<END>>")
+                continue
+
+            user_message = str(payload.get("message", ""))
 
             # Construct messages for LLM
-            messages = history + [{"role": "user", "content": user_message}]
-            
-            # Stream response
-            response_text = ""
-            stream = llm_client.stream_chat_completion(messages)
-            
-            for chunk in stream:
-                response_text += chunk
-                await websocket.send_text(chunk)
-            
+            messages = _build_messages(payload.get("history", []), user_message)
+
+            # Stream the response in a task so this loop can keep listening
+            # for a cancel frame while tokens are being sent.
+            turn = asyncio.create_task(_stream_turn(websocket, messages, current_user.email))
+            while not turn.done():
+                receiver = asyncio.create_task(websocket.receive_text())
+                done, _ = await asyncio.wait({turn, receiver}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver not in done:
+                    receiver.cancel()
+                    break
+                incoming = _parse_message(receiver.result())
+                turn.cancel()
+                if incoming.get("type") != "cancel":
+                    # A new question supersedes the one being answered
+                    pending = incoming
+                print(f"Client #{client_id} interrupted the response")
+
+            try:
+                await turn
+            except asyncio.CancelledError:
+                pass
+
             # Send a special delimiter or just end the loop for this message?
             # The client needs to know when the turn ends.
-            # Let's send a JSON with "done": true or a special char.
-            # Simple approach: The client detects silence or we send a final JSON.
-            # For voice-to-voice, raw stream is best. We can send a null byte or specific string.
+            # For voice-to-voice, raw stream is best, so we send a plain marker
+            # (also after a cancelled turn).
             await websocket.send_text("<<END>>")
 
     except WebSocketDisconnect:
         print(f"Client #{client_id} disconnected")
+    finally:
+        if turn is not None and not turn.done():
+            # Abort the upstream generation for a client that went away
+            turn.cancel()
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Builds a content-addressed cache key (sha256) from the given parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapses whitespace so prompts that only differ in indentation
+    (f-string templates in the graph nodes) share a cache entry.
+    """
+    return " ".join(prompt.split())
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL.
+    """
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores `value` for `ttl` seconds (default_ttl if None; never expires if
+        both are None). A TTL of 0 or less means "do not cache".
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier backed by SQLite. Values must be JSON serializable.
+    Safe to share between uvicorn worker processes.
+    """
+    def __init__(self, path: str, default_ttl: Optional[float] = None):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # One connection per process, serialized by the lock
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value, _ = self.get_entry(key, default)
+        return value
+
+    def get_entry(self, key: str, default: Any = None) -> Tuple[Any, Optional[float]]:
+        """
+        Returns (value, expires_at) with expires_at as a time.time() timestamp,
+        or (default, None) on a miss.
+        """
+        with self._lock, self._conn as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default, None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return default, None
+        self.hits += 1
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock, self._conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache for LLM responses.
+    Disk hits are promoted into the memory tier for their remaining TTL.
+    """
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None, disk_path: str = ""):
+        self.memory = LRUCache(max_entries=max_entries, default_ttl=default_ttl)
+        self.disk: Optional[SQLiteCache] = None
+        if disk_path:
+            try:
+                self.disk = SQLiteCache(disk_path, default_ttl=default_ttl)
+            except Exception as e:
+                print(f"WARNING: LLM disk cache unavailable ({e}). Using memory only.")
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value, expires_at = self.disk.get_entry(key)
+            if value is not None:
+                ttl = expires_at - time.time() if expires_at is not None else None
+                self.memory.set(key, value, ttl=ttl)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl=ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
@@ -0,0 +1,146 @@
+import re
+from typing import List, NamedTuple, Tuple
+from app.core.rate_limit import estimate_tokens
+
+_HEADER = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+class Chunk(NamedTuple):
+    text: str
+    section: str        # Header breadcrumb, e.g. "Variables > Type Conversion"
+    overlap_end: int    # Chars at the start of `text` repeated from the previous chunk
+
+
+class _Block(NamedTuple):
+    text: str
+    fence: str          # Opening fence line for code blocks, "" otherwise
+
+
+def _sections(markdown: str) -> List[Tuple[str, str, List[_Block]]]:
+    """
+    Splits markdown into (breadcrumb, header line, blocks). Blocks are
+    paragraphs/lists separated by blank lines, or whole fenced code blocks;
+    headers inside code fences are not treated as headers.
+    """
+    sections: List[Tuple[str, str, List[_Block]]] = []
+    path: List[Tuple[int, str]] = []
+    header, blocks, current, fence = "", [], [], ""
+
+    def flush_block():
+        if current:
+            blocks.append(_Block("\n".join(current), fence))
+            current.clear()
+
+    def flush_section():
+        flush_block()
+        if blocks or header:
+            sections.append((" > ".join(title for _, title in path), header, list(blocks)))
+        blocks.clear()
+
+    for line in markdown.strip().splitlines():
+        if fence:
+            current.append(line)
+            if _FENCE.match(line) and line.strip().startswith(fence[:3]) and len(current) > 1:
+                flush_block()
+                fence = ""
+            continue
+
+        if _FENCE.match(line):
+            flush_block()
+            fence = line.strip()
+            current.append(line)
+            continue
+
+        match = _HEADER.match(line)
+        if match:
+            flush_section()
+            level = len(match.group(1))
+            path = [(lvl, title) for lvl, title in path if lvl < level] + [(level, match.group(2))]
+            header = line.strip()
+        elif not line.strip():
+            flush_block()
+        else:
+            current.append(line)
+
+    flush_section()
+    return sections
+
+
+def _split_block(block: _Block, target_tokens: int) -> List[_Block]:
+    # Oversized blocks are cut on line boundaries; code pieces keep their fences
+    if estimate_tokens(block.text) <= target_tokens:
+        return [block]
+    lines = block.text.splitlines()
+    if block.fence:
+        lines = lines[1:-1] if len(lines) > 1 and _FENCE.match(lines[-1]) else lines[1:]
+    pieces, current = [], []
+    for line in lines:
+        if current and estimate_tokens("\n".join(current + [line])) > target_tokens:
+            pieces.append(current)
+            current = []
+        current.append(line)
+    if current:
+        pieces.append(current)
+    if block.fence:
+        return [_Block("\n".join([block.fence] + piece + ["```"]), block.fence) for piece in pieces]
+    return [_Block("\n".join(piece), "") for piece in pieces]
+
+
+def chunk_markdown(markdown: str, target_tokens: int = 200, overlap_tokens: int = 40) -> List[Chunk]:
+    """
+    Splits markdown on headers into chunks of about `target_tokens`, never
+    cutting through a code fence unless the block alone is over the target.
+    Consecutive chunks of the same section repeat up to `overlap_tokens` of
+    trailing blocks, and every chunk starts with its section's header line.
+    """
+    chunks: List[Chunk] = []
+    for section, header, blocks in _sections(markdown):
+        pieces = [piece for block in blocks for piece in _split_block(block, target_tokens)]
+        prefix = f"{header}\n\n" if header else ""
+        if not pieces:
+            chunks.append(Chunk(header, section, 0))
+            continue
+
+        current: List[_Block] = []
+        carried = 0  # Blocks at the start of `current` repeated from the previous chunk
+        for piece in pieces:
+            candidate = prefix + "\n\n".join(b.text for b in current + [piece])
+            if current and len(current) > carried and estimate_tokens(candidate) > target_tokens:
+                chunks.append(_make_chunk(prefix, current, carried, section, continuation=bool(chunks and chunks[-1].section == section)))
+                # Carry whole trailing blocks within the overlap budget
+                overlap: List[_Block] = []
+                for block in reversed(current):
+                    if estimate_tokens("\n\n".join(b.text for b in [block] + overlap)) > overlap_tokens:
+                        break
+                    overlap.insert(0, block)
+                current, carried = overlap, len(overlap)
+            current.append(piece)
+        chunks.append(_make_chunk(prefix, current, carried, section, continuation=bool(chunks and chunks[-1].section == section)))
+    return chunks
+
+
+def _make_chunk(prefix: str, blocks: List[_Block], carried: int, section: str, continuation: bool) -> Chunk:
+    text = prefix + "\n\n".join(b.text for b in blocks)
+    overlap_end = 0
+    if continuation:
+        # The header line plus the carried blocks were already in the previous chunk
+        repeated = "\n\n".join(b.text for b in blocks[:carried])
+        overlap_end = len(prefix) + len(repeated) + (2 if carried and carried < len(blocks) else 0)
+    return Chunk(text, section, overlap_end)
+
+
+def merge_adjacent(chunks: List[Tuple[int, str, int]]) -> List[str]:
+    """
+    Joins chunks of one document given as (index, text, overlap_end): runs of
+    consecutive indexes become one text with the repeated overlap removed.
+    """
+    merged: List[str] = []
+    previous = None
+    for index, text, overlap_end in sorted(chunks):
+        if previous is not None and index == previous + 1:
+            merged[-1] = merged[-1] + "\n\n" + text[overlap_end:]
+        else:
+            merged.append(text)
+        previous = index
+    return merged
@@ -18,6 +18,100 @@ class Settings(BaseSettings):
     
     # AI
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-flash-latest"
+    LLM_MAX_CONCURRENCY: int = 16  # In-flight async Gemini requests per worker
+
+    # LLM response cache (TTL in seconds, 0 disables; empty path disables the disk tier)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    LLM_CACHE_TTL_SECONDS: int = 60 * 60
+    LLM_CACHE_DB_PATH: str = ""
+
+    # LLM quota governor (per worker process; 0 daily tokens disables the user budget)
+    LLM_REQUESTS_PER_MINUTE: int = 15
+    LLM_TOKENS_PER_MINUTE: int = 1_000_000
+    LLM_USER_DAILY_TOKENS: int = 200_000
+    LLM_QUEUE_MAX_WAIT_SECONDS: float = 10.0
+    LLM_QUOTA_COOLDOWN_SECONDS: float = 60.0
+
+    # Local intent router for the supervisor (LLM is used below the threshold)
+    INTENT_ROUTER_ENABLED: bool = True
+    INTENT_ROUTER_THRESHOLD: float = 0.6
+    INTENT_DECISION_LOG_PATH: str = ""  # JSONL decision log for offline evaluation
+
+    # WebSocket interview streaming: flush a frame at N chars or after N ms
+    WS_STREAM_FLUSH_CHARS: int = 48
+    WS_STREAM_FLUSH_MS: int = 40
+
+    # Load the RAG embedding model / vector store in the background at startup
+    # (lesson requests use the static topic content until it is ready)
+    RAG_WARM_UP_ON_STARTUP: bool = True
+    # Changed chunks are embedded this many at a time when syncing TOPIC_DATA into Chroma
+    RAG_EMBED_BATCH_SIZE: int = 64
+    # Topic markdown is split on headers / code fences into chunks of ~N tokens
+    RAG_CHUNK_TOKENS: int = 200
+    RAG_CHUNK_OVERLAP_TOKENS: int = 40
+    # Query embeddings and retrieved contexts (dropped whenever the collection content changes)
+    RAG_QUERY_CACHE_MAX_ENTRIES: int = 512
+    RAG_QUERY_CACHE_TTL_SECONDS: int = 3600
+
+    # Interview session store: "memory" (single worker), "sqlite" (shared by
+    # workers on one host) or "redis" (any Redis-compatible server)
+    SESSION_STORE_BACKEND: str = "memory"
+    SESSION_TTL_SECONDS: int = 2 * 60 * 60
+    SESSION_MAX_ENTRIES: int = 10000
+    SESSION_DB_PATH: str = "sessions.sqlite3"
+    SESSION_REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_SWEEP_INTERVAL_SECONDS: int = 300
+
+    # Conversation windows: recent messages kept verbatim, older ones summarized
+    CONTEXT_KEEP_MESSAGES: int = 6
+    CONTEXT_FOLD_BATCH: int = 6
+    CONTEXT_MAX_TOKENS: int = 1500
+    CONTEXT_SUMMARY_WORDS: int = 150
+
+    # Per-process cache of user docs used by get_current_user (0 disables)
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 5000
+
+    # Verified JWT claims cache; entries never outlive the token's exp
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+    JWT_CACHE_TTL_SECONDS: int = 300
+
+    # Password hashing: bcrypt work factor and size of the thread pool it runs in
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Code execution: "piston" (remote Piston API) or "local" (subprocess sandbox)
+    EXECUTION_BACKEND: str = "piston"
+    PISTON_URL: str = "https://emkc.org/api/v2/piston"
+    # Piston client: timeouts, retries on connection errors / 429 / 502-504, circuit breaker
+    PISTON_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    PISTON_READ_TIMEOUT_SECONDS: float = 20.0
+    PISTON_MAX_RETRIES: int = 2
+    PISTON_RETRY_BACKOFF_SECONDS: float = 0.2
+    PISTON_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    PISTON_CIRCUIT_RESET_SECONDS: float = 30.0
+    SANDBOX_WALL_TIMEOUT_SECONDS: float = 5.0
+    SANDBOX_CPU_SECONDS: int = 3
+    SANDBOX_MEMORY_MB: int = 256
+    SANDBOX_MAX_PROCESSES: int = 64
+    SANDBOX_MAX_OUTPUT_KB: int = 64
+    SANDBOX_COMPILE_TIMEOUT_SECONDS: float = 15.0
+    SANDBOX_BUILD_CACHE_ENTRIES: int = 256  # Compiled (Java) submissions kept, by source hash
+    # Warm Python interpreters that fork per run (0 disables); recycled after N runs or any timeout
+    SANDBOX_PYTHON_POOL_SIZE: int = 4
+    SANDBOX_PYTHON_POOL_MAX_RUNS: int = 100
+    SANDBOX_WORKDIR: str = ""  # Parent dir for per-run temp dirs (default: system temp)
+    # Test cases run in parallel: pool size shared by all requests, cap per submission
+    EXECUTION_MAX_WORKERS: int = 16
+    EXECUTION_SUBMISSION_CONCURRENCY: int = 4
+    # Results of repeated identical runs (same runtime, code and stdin); 0 entries disables
+    EXECUTION_CACHE_MAX_ENTRIES: int = 1000
+    EXECUTION_CACHE_TTL_SECONDS: int = 600
+    # Competitive judge defaults, overridable per problem (time_limit_ms / memory_limit_mb)
+    JUDGE_TIME_LIMIT_MS: int = 2000
+    JUDGE_MEMORY_LIMIT_MB: int = 256
 
     class Config:
         env_file = ".env"
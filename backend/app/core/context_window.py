@@ -0,0 +1,101 @@
+from typing import Dict, List, NamedTuple, Optional
+from app.core.config import settings
+from app.core.llm import async_llm_client
+from app.core.rate_limit import LLMPriority, estimate_tokens
+
+Message = Dict[str, str]
+
+
+def count_tokens(messages: List[Message]) -> int:
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages)
+
+
+def trim_to_budget(messages: List[Message], max_tokens: int, min_keep: int = 1) -> List[Message]:
+    """
+    Drops the oldest messages until the rest fit in `max_tokens`.
+    Always keeps the last `min_keep` messages.
+    """
+    kept = list(messages)
+    while len(kept) > min_keep and count_tokens(kept) > max_tokens:
+        kept.pop(0)
+    return kept
+
+
+class WindowState(NamedTuple):
+    summary: str
+    summarized_upto: int       # history[:summarized_upto] is folded into summary
+    recent: List[Message]      # verbatim turns to send with the prompt
+
+
+class ConversationWindow:
+    """
+    Keeps prompt size flat for long conversations: the last `keep_messages`
+    turns are sent verbatim (within `max_tokens`), older turns are folded into
+    a running summary. Folding happens in batches of `fold_batch` messages so
+    the summary is updated incrementally instead of every turn; the caller
+    persists (summary, summarized_upto) with its session.
+    """
+    def __init__(self, keep_messages: int, fold_batch: int, max_tokens: int, summary_words: int):
+        self.keep_messages = keep_messages
+        self.fold_batch = fold_batch
+        self.max_tokens = max_tokens
+        self.summary_words = summary_words
+        self.folds = 0
+        self.failed_folds = 0
+
+    def _split(self, history: List[Message], summarized_upto: int) -> int:
+        """
+        Returns the index where the verbatim window should start.
+        """
+        pending = history[summarized_upto:]
+        if len(pending) <= self.keep_messages + self.fold_batch and count_tokens(pending) <= self.max_tokens:
+            return summarized_upto
+        start = max(summarized_upto, len(history) - self.keep_messages)
+        # Shrink further if the last turns alone are over budget (long answers)
+        while start < len(history) - 1 and count_tokens(history[start:]) > self.max_tokens:
+            start += 1
+        return start
+
+    def _summary_prompt(self, summary: str, turns: List[Message]) -> str:
+        transcript = "\n".join(f"{m.get('role', 'user').upper()}: {m.get('content', '')}" for m in turns)
+        return f"""
+    You maintain a running summary of a conversation between a candidate and an interviewer.
+    Update the summary with the new turns below. Keep the questions asked, how well the
+    candidate answered, and any open threads. Use at most {self.summary_words} words.
+    Return only the updated summary.
+
+    Current summary:
+    {summary or "(none yet)"}
+
+    New turns:
+    {transcript}
+    """
+
+    async def aprepare(self, history: List[Message], summary: str = "", summarized_upto: int = 0, user: Optional[str] = None) -> WindowState:
+        start = self._split(history, summarized_upto)
+        if start > summarized_upto:
+            to_fold = history[summarized_upto:start]
+            try:
+                summary = (await async_llm_client.agenerate(
+                    self._summary_prompt(summary, to_fold),
+                    priority=LLMPriority.NORMAL,
+                    user=user,
+                    fallback=False
+                )).strip()
+            except Exception as e:
+                # Keep the old summary and leave the turns unfolded so the next
+                # turn retries; this turn still only sends the recent window
+                print(f"ConversationWindow: Summary update failed ({e}), will retry next turn.")
+                self.failed_folds += 1
+                return WindowState(summary, summarized_upto, history[start:])
+            summarized_upto = start
+            self.folds += 1
+        return WindowState(summary, summarized_upto, history[summarized_upto:])
+
+
+interview_window = ConversationWindow(
+    keep_messages=settings.CONTEXT_KEEP_MESSAGES,
+    fold_batch=settings.CONTEXT_FOLD_BATCH,
+    max_tokens=settings.CONTEXT_MAX_TOKENS,
+    summary_words=settings.CONTEXT_SUMMARY_WORDS
+)
@@ -1,16 +1,36 @@
+import asyncio
 import google.generativeai as genai
 from app.core.config import settings
-from typing import List, Dict
+from app.core.cache import ResponseCache, make_key, normalize_prompt
+from app.core.singleflight import SingleFlight, AsyncSingleFlight
+from app.core.rate_limit import LLMPriority, QuotaExceeded, estimate_tokens, quota_governor
+from app.core import metrics
+from typing import List, Dict, Optional, AsyncIterator
+
+class LLMUnavailable(Exception):
+    """
+    Raised instead of returning mock text when the caller asked for no fallback.
+    """
+    pass
 
 class LLMClient:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
+        self.model_name = settings.GEMINI_MODEL
+        self.cache = ResponseCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            default_ttl=settings.LLM_CACHE_TTL_SECONDS,
+            disk_path=settings.LLM_CACHE_DB_PATH
+        ) if settings.LLM_CACHE_ENABLED else None
+        # Identical prompts already in flight share one upstream request
+        self.flight = SingleFlight()
+        self.governor = quota_governor
         print(f"DEBUG: LLMClient initializing. Key loaded: '{self.api_key[:10]}...' (len={len(self.api_key)})")
         if self.api_key and "YOUR_" not in self.api_key:
             try:
                 genai.configure(api_key=self.api_key)
                 # gemini-1.5-flash failed, using gemini-flash-latest from list
-                self.model = genai.GenerativeModel('gemini-flash-latest')
+                self.model = genai.GenerativeModel(self.model_name)
                 self.client_ready = True
                 print("DEBUG: LLMClient Ready (Real Gemini)")
             except Exception as e:
@@ -20,26 +40,82 @@ class LLMClient:
             self.client_ready = False
             print("WARNING: Gemini API Key not set. Using Mock LLM.")
 
-    def generate(self, prompt: str) -> str:
+    def generate(
+        self,
+        prompt: str,
+        cache_ttl: Optional[int] = None,
+        priority: LLMPriority = LLMPriority.NORMAL,
+        user: Optional[str] = None,
+        fallback: bool = True
+    ) -> str:
         """
         Generates text based on prompt using Gemini.
+        Responses are cached by (model, normalized prompt). `cache_ttl` overrides
+        the default TTL for this call site; 0 bypasses the cache.
+        Cache misses must be admitted by the quota governor; `priority` decides
+        whether the call is queued or shed, `user` is charged the tokens.
+        With `fallback=False` failures raise instead of returning mock text.
         """
         if not self.client_ready:
+            if not fallback:
+                raise LLMUnavailable("LLM client not configured")
             return self._mock_response(prompt)
-        
+
+        cache_key = self._cache_key(prompt, cache_ttl)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        def _call() -> str:
+            # The shared request/token buckets are taken once per upstream call
+            self.governor.acquire(estimate_tokens(prompt), priority)
+            text = self.model.generate_content(prompt).text
+            self.governor.record_response(estimate_tokens(text))
+            if cache_key:
+                self.cache.set(cache_key, text, ttl=cache_ttl)
+            return text
+
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Every caller is checked and charged, whether it leads or joins the flight
+            self.governor.admit_user(estimate_tokens(prompt), priority, user)
+            text = self.flight.do(self._prompt_key(prompt), _call)
+            self.governor.charge_user(user, estimate_tokens(text))
+            return text
         except Exception as e:
-            error_str = str(e).lower()
-            if "429" in error_str or "quota" in error_str or "resource" in error_str:
-                print(f"CRITICAL: AI Quota Exceeded. {e}")
-                raise Exception("AI_QUOTA_EXCEEDED")
-                
-            print(f"LLM Error: {e}")
-            return self._mock_response(prompt)
+            return self._handle_error(e, prompt, fallback)
+
+    def _prompt_key(self, prompt: str) -> str:
+        return make_key(self.model_name, normalize_prompt(prompt))
+
+    def _cache_key(self, prompt: str, cache_ttl: Optional[int]) -> Optional[str]:
+        if self.cache is None or cache_ttl == 0:
+            return None
+        return self._prompt_key(prompt)
+
+    def _handle_error(self, e: Exception, prompt: str, fallback: bool = True) -> str:
+        if isinstance(e, QuotaExceeded):
+            # Shed locally by the governor, nothing was sent upstream
+            raise e
+
+        error_str = str(e).lower()
+        if "429" in error_str or "quota" in error_str or "resource" in error_str:
+            print(f"CRITICAL: AI Quota Exceeded. {e}")
+            self.governor.note_upstream_quota()
+            raise Exception("AI_QUOTA_EXCEEDED")
+            
+        print(f"LLM Error: {e}")
+        if not fallback:
+            raise LLMUnavailable(str(e))
+        return self._mock_response(prompt)
 
-    def chat_completion(self, messages: List[Dict[str, str]]) -> str:
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        cache_ttl: Optional[int] = None,
+        priority: LLMPriority = LLMPriority.NORMAL,
+        user: Optional[str] = None
+    ) -> str:
         """
         Handles chat completion by converting messages to a single prompt string.
         Adaptor for models that prefer single prompt or for simplicity.
@@ -49,6 +125,38 @@ class LLMClient:
             last_msg = messages[-1].get("content", "")
             return self._mock_response(last_msg)
 
+        full_prompt = self._build_chat_prompt(messages)
+        return self.generate(full_prompt, cache_ttl=cache_ttl, priority=priority, user=user)
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], user: Optional[str] = None):
+        """
+        Yields chunks of text for real-time streaming.
+        Failures raise (after any chunks already yielded) rather than being
+        yielded as text.
+        """
+        if not self.client_ready:
+            # Mock stream
+            last_msg = messages[-1].get("content", "")
+            response = self._mock_response(last_msg)
+            for word in response.split():
+                yield word + " "
+            return
+
+        full_prompt = self._build_stream_prompt(messages)
+
+        try:
+            self.governor.acquire(estimate_tokens(full_prompt), LLMPriority.HIGH, user)
+            response = self.model.generate_content(full_prompt, stream=True)
+            for chunk in response:
+                if chunk.text:
+                    self.governor.record_response(estimate_tokens(chunk.text), user)
+                    yield chunk.text
+        except Exception as e:
+            print(f"Stream Error: {e}")
+            # Always raises without the mock fallback
+            self._handle_error(e, full_prompt, fallback=False)
+
+    def _build_chat_prompt(self, messages: List[Dict[str, str]]) -> str:
         # Convert history validation to a prompt string
         # Gemini does support history objects, but string concatenation is robust for basic usage
         full_prompt = ""
@@ -87,21 +195,9 @@ class LLMClient:
                 full_prompt += f"\n{role.upper()}: {content}"
         
         full_prompt += "\nASSISTANT: "
-        
-        return self.generate(full_prompt)
-
-    def stream_chat_completion(self, messages: List[Dict[str, str]]):
-        """
-        Yields chunks of text for real-time streaming.
-        """
-        if not self.client_ready:
-            # Mock stream
-            last_msg = messages[-1].get("content", "")
-            response = self._mock_response(last_msg)
-            for word in response.split():
-                yield word + " "
-            return
+        return full_prompt
 
+    def _build_stream_prompt(self, messages: List[Dict[str, str]]) -> str:
         full_prompt = ""
         for msg in messages:
             role = msg.get("role", "user").upper()
@@ -109,15 +205,7 @@ class LLMClient:
             full_prompt += f"\n{role}: {content}"
         
         full_prompt += "\nASSISTANT: "
-
-        try:
-            response = self.model.generate_content(full_prompt, stream=True)
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-        except Exception as e:
-            print(f"Stream Error: {e}")
-            yield " Error generating response."
+        return full_prompt
 
     def _mock_response(self, prompt: str) -> str:
         """
@@ -140,4 +228,147 @@ class LLMClient:
             
         return "I am a mock AI agent (Gemini Key missing). processed: " + prompt[:50] + "..."
 
+    def stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "client_ready": self.client_ready,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "single_flight": self.flight.stats()
+        }
+
+class AsyncLLMClient:
+    """
+    asyncio counterpart of LLMClient, backed by the SDK's *_async API.
+    Shares the sync client's model, cache, prompt formatting and mock fallback,
+    and bounds in-flight Gemini requests with a semaphore so a burst of
+    learners cannot open unbounded upstream connections.
+    """
+    def __init__(self, client: LLMClient, max_concurrency: int = 16):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.flight = AsyncSingleFlight()
+        self.in_flight = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop, not the import-time one
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def agenerate(
+        self,
+        prompt: str,
+        cache_ttl: Optional[int] = None,
+        priority: LLMPriority = LLMPriority.NORMAL,
+        user: Optional[str] = None,
+        fallback: bool = True
+    ) -> str:
+        """
+        Async version of LLMClient.generate.
+        """
+        client = self.client
+        if not client.client_ready:
+            if not fallback:
+                raise LLMUnavailable("LLM client not configured")
+            return client._mock_response(prompt)
+
+        cache_key = client._cache_key(prompt, cache_ttl)
+        if cache_key:
+            cached = client.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def _call() -> str:
+            await client.governor.aacquire(estimate_tokens(prompt), priority)
+            async with self.semaphore:
+                self.in_flight += 1
+                try:
+                    response = await client.model.generate_content_async(prompt)
+                finally:
+                    self.in_flight -= 1
+            text = response.text
+            client.governor.record_response(estimate_tokens(text))
+            if cache_key:
+                client.cache.set(cache_key, text, ttl=cache_ttl)
+            return text
+
+        try:
+            client.governor.admit_user(estimate_tokens(prompt), priority, user)
+            text = await self.flight.do(client._prompt_key(prompt), _call)
+            client.governor.charge_user(user, estimate_tokens(text))
+            return text
+        except Exception as e:
+            return client._handle_error(e, prompt, fallback)
+
+    async def achat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        cache_ttl: Optional[int] = None,
+        priority: LLMPriority = LLMPriority.NORMAL,
+        user: Optional[str] = None
+    ) -> str:
+        """
+        Async version of LLMClient.chat_completion.
+        """
+        if not self.client.client_ready:
+            last_msg = messages[-1].get("content", "")
+            return self.client._mock_response(last_msg)
+
+        full_prompt = self.client._build_chat_prompt(messages)
+        return await self.agenerate(full_prompt, cache_ttl=cache_ttl, priority=priority, user=user)
+
+    async def astream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        user: Optional[str] = None,
+        priority: LLMPriority = LLMPriority.HIGH
+    ) -> AsyncIterator[str]:
+        """
+        Yields chunks of text without blocking the event loop.
+        The semaphore slot is held until the stream is exhausted or closed.
+        Like stream_chat_completion, failures raise instead of yielding text.
+        """
+        client = self.client
+        if not client.client_ready:
+            last_msg = messages[-1].get("content", "")
+            response = client._mock_response(last_msg)
+            for word in response.split():
+                yield word + " "
+            return
+
+        full_prompt = client._build_stream_prompt(messages)
+
+        try:
+            await client.governor.aacquire(estimate_tokens(full_prompt), priority, user)
+        except QuotaExceeded as e:
+            print(f"Stream Error: {e.reason}")
+            raise
+
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                response = await client.model.generate_content_async(full_prompt, stream=True)
+                async for chunk in response:
+                    if chunk.text:
+                        client.governor.record_response(estimate_tokens(chunk.text), user)
+                        yield chunk.text
+            except Exception as e:
+                print(f"Stream Error: {e}")
+                client._handle_error(e, full_prompt, fallback=False)
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "single_flight": self.flight.stats()
+        }
+
 llm_client = LLMClient()
+async_llm_client = AsyncLLMClient(llm_client, max_concurrency=settings.LLM_MAX_CONCURRENCY)
+metrics.register("llm", llm_client.stats)
+metrics.register("llm_async", async_llm_client.stats)
+metrics.register("llm_quota", quota_governor.stats)
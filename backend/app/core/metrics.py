@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+# Name -> zero-arg callable returning a JSON-serializable stats dict.
+# Components register themselves at import time; /metrics renders a snapshot.
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Any]:
+    data = {}
+    for name, provider in _providers.items():
+        try:
+            data[name] = provider()
+        except Exception as e:
+            data[name] = {"error": str(e)}
+    return data
+
+
+class LatencyWindow:
+    """
+    Keeps the last `size` latency samples (seconds) and reports percentiles in ms.
+    """
+    def __init__(self, size: int = 1024):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def percentiles(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        if not samples:
+            return {"count": count}
+
+        def pct(p: float) -> float:
+            index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+            return round(samples[index] * 1000, 1)
+
+        return {"count": count, "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99), "max_ms": round(samples[-1] * 1000, 1)}
@@ -1,12 +1,79 @@
-import chromadb
-from chromadb.utils import embedding_functions
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core import metrics
+from app.core.cache import LRUCache, make_key
+from app.core.chunking import chunk_markdown, merge_adjacent
+from app.core.config import settings
 from app.data.static_content import TOPIC_DATA
-import os
+
+
+def content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_chunks(target_tokens: int = 200, overlap_tokens: int = 40) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    The desired contents of the collection as (id, document, metadata),
+    each metadata carrying the chunk's content_hash.
+    """
+    chunks = []
+    for lang, topics in TOPIC_DATA.items():
+        for topic_id, data in topics.items():
+            title = data.get("title", "Unknown")
+
+            # Content chunks, split on headers / code fences; chunk_index and
+            # overlap_end let query_context stitch neighbours back together
+            for i, chunk in enumerate(chunk_markdown(data.get("content", ""), target_tokens, overlap_tokens)):
+                chunks.append((
+                    f"{lang}_{topic_id}_content_{i}",
+                    chunk.text,
+                    {
+                        "topic": title,
+                        "topic_id": topic_id,
+                        "language": lang,
+                        "type": "concept",
+                        "section": chunk.section,
+                        "chunk_index": i,
+                        "overlap_end": chunk.overlap_end
+                    }
+                ))
+
+            # Examples Chunk
+            for i, ex in enumerate(data.get("examples", [])):
+                chunks.append((
+                    f"{lang}_{topic_id}_example_{i}",
+                    f"Example for {title}:\n{ex}",
+                    {"topic": title, "topic_id": topic_id, "language": lang, "type": "example"}
+                ))
+
+    for _, document, metadata in chunks:
+        metadata["content_hash"] = content_hash(document, metadata)
+    return chunks
+
 
 class RAGSystem:
-    def __init__(self):
+    def __init__(
+        self,
+        sync: bool = True,
+        batch_size: int = 64,
+        chunk_tokens: int = 200,
+        chunk_overlap_tokens: int = 40,
+        query_cache_entries: int = 512,
+        query_cache_ttl: float = 3600
+    ):
+        # Heavy imports stay here so importing this module is cheap
+        import chromadb
+        from chromadb.utils import embedding_functions
+
         # Persist data to 'chroma_db' folder in backend root
         self.persist_directory = "chroma_db"
+        self.batch_size = batch_size
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
         
         # Use a lightweight local embedding model
         # 'all-MiniLM-L6-v2' is standard for speed/quality balance
@@ -22,72 +89,232 @@ class RAGSystem:
             embedding_function=self.embedding_fn
         )
         
-        # Check if empty, if so, ingest
-        if self.collection.count() == 0:
-            print("RAG: Collection empty. Ingesting static content...")
-            self.ingest_static_content()
-        else:
-            print(f"RAG: Loaded {self.collection.count()} documents from persistence.")
-
-    def ingest_static_content(self):
+        # Query embeddings by text, and formatted contexts by (query, options,
+        # collection version). The TTL bounds staleness after a sync run by
+        # another process (scripts/sync_rag_content.py).
+        self.embedding_cache = LRUCache(max_entries=query_cache_entries)
+        self.result_cache = LRUCache(max_entries=query_cache_entries, default_ttl=query_cache_ttl)
+        self.version = ""
+
+        # Only chunks whose content changed since the last sync get re-embedded
+        if sync:
+            self.sync()
+        self.refresh_version()
+        print(f"RAG: Loaded {self.collection.count()} documents.")
+
+    def refresh_version(self) -> str:
         """
-        Reads TOPIC_DATA from static_content.py and adds to ChromaDB.
+        Recomputes the collection version (digest of all chunk hashes) and
+        drops cached retrievals if the content changed.
         """
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for lang, topics in TOPIC_DATA.items():
-            for topic_id, data in topics.items():
-                title = data.get("title", "Unknown")
-                content = data.get("content", "")
-                
-                # Chunking strategy: 
-                # Ideally split by headers, but for now entire topic content is small enough (~500 words)
-                # to be a single chunk or maybe 2. 
-                # Let's just use the full content as one chunk per topic for simplicity.
-                # If content is huge, we should split it.
-                
-                # Main Content Chunk
-                documents.append(content)
-                metadatas.append({"topic": title, "language": lang, "type": "concept"})
-                ids.append(f"{lang}_{topic_id}_content")
-                
-                # Examples Chunk
-                examples = data.get("examples", [])
-                for i, ex in enumerate(examples):
-                    documents.append(f"Example for {title}:\n{ex}")
-                    metadatas.append({"topic": title, "language": lang, "type": "example"})
-                    ids.append(f"{lang}_{topic_id}_example_{i}")
-        
-        if documents:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+        hashes = sorted(f"{doc_id}:{digest}" for doc_id, digest in self._stored_hashes().items())
+        version = make_key(*hashes)
+        if version != self.version:
+            self.version = version
+            self.result_cache.clear()
+        return version
+
+    def embed_query(self, text: str) -> List[float]:
+        embedding = self.embedding_cache.get(text)
+        if embedding is None:
+            embedding = [float(x) for x in self.embedding_fn([text])[0]]
+            self.embedding_cache.set(text, embedding)
+        return embedding
+
+    def _stored_hashes(self) -> Dict[str, Optional[str]]:
+        stored = self.collection.get(include=["metadatas"])
+        return {
+            doc_id: (meta or {}).get("content_hash")
+            for doc_id, meta in zip(stored["ids"], stored["metadatas"] or [])
+        }
+
+    def plan_sync(self) -> Tuple[List[Tuple[str, str, Dict[str, Any]]], List[str], int]:
+        """
+        Returns (chunks to upsert, ids to delete, unchanged count).
+        """
+        stored = self._stored_hashes()
+        chunks = build_chunks(self.chunk_tokens, self.chunk_overlap_tokens)
+        wanted = {chunk[0] for chunk in chunks}
+        changed = [chunk for chunk in chunks if stored.get(chunk[0]) != chunk[2]["content_hash"]]
+        removed = [doc_id for doc_id in stored if doc_id not in wanted]
+        return changed, removed, len(chunks) - len(changed)
+
+    def sync(
+        self,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dry_run: bool = False
+    ) -> Dict[str, int]:
+        """
+        Brings the collection in line with TOPIC_DATA: upserts new or changed
+        chunks (embedding them `batch_size` at a time) and deletes chunks that
+        no longer exist. `progress(done, total)` is called after each batch.
+        """
+        batch_size = batch_size or self.batch_size
+        changed, removed, unchanged = self.plan_sync()
+        report = {"upserted": len(changed), "deleted": len(removed), "unchanged": unchanged}
+        if dry_run or not (changed or removed):
+            return report
+
+        start = time.perf_counter()
+        for offset in range(0, len(changed), batch_size):
+            batch = changed[offset:offset + batch_size]
+            self.collection.upsert(
+                ids=[doc_id for doc_id, _, _ in batch],
+                documents=[document for _, document, _ in batch],
+                metadatas=[metadata for _, _, metadata in batch]
             )
-            print(f"RAG: Successfully ingested {len(documents)} chunks.")
+            if progress:
+                progress(offset + len(batch), len(changed))
+        if removed:
+            self.collection.delete(ids=removed)
+        self.refresh_version()
+
+        print(f"RAG: Synced content in {time.perf_counter() - start:.1f}s "
+              f"({report['upserted']} upserted, {report['deleted']} deleted, {unchanged} unchanged).")
+        return report
 
-    def query_context(self, query: str, n_results: int = 2) -> str:
+    def query_context(self, query: str, n_results: int = 2, merge: bool = True, where: Optional[Dict[str, Any]] = None) -> str:
         """
         Retrieves top similar chunks and formats them as a string.
+        With `merge`, consecutive chunks of the same topic are joined into one
+        block (overlap removed), ordered by their best-ranked chunk.
+        `where` is passed to Chroma as a metadata filter.
         """
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
+        cache_key = make_key(self.version, query, n_results, merge, json.dumps(where, sort_keys=True))
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        query_args = {"query_embeddings": [self.embed_query(query)], "n_results": n_results}
+        if where:
+            query_args["where"] = where
+        results = self.collection.query(**query_args)
         
         # Results structure: {'documents': [[...]], 'metadatas': [[...]], ...}
         docs = results.get('documents', [[]])[0]
         metas = results.get('metadatas', [[]])[0]
-        
-        context_parts = []
+
+        # Rank-ordered (topic, group key, text); concept chunks of one topic
+        # share a group key and are emitted where the best of them ranked
+        blocks: List[Tuple[str, Optional[Tuple[str, str]], str]] = []
+        groups: Dict[Tuple[str, str], List[Tuple[int, str, int]]] = {}
         for i, doc in enumerate(docs):
             meta = metas[i] if i < len(metas) else {}
             topic = meta.get('topic', 'General')
-            context_parts.append(f"--- Context (Topic: {topic}) ---\n{doc}\n")
+            if merge and meta.get('type') == 'concept' and 'chunk_index' in meta:
+                key = (meta.get('language', ''), meta.get('topic_id', topic))
+                if key not in groups:
+                    groups[key] = []
+                    blocks.append((topic, key, ""))
+                groups[key].append((meta['chunk_index'], doc, meta.get('overlap_end', 0)))
+            else:
+                blocks.append((topic, None, doc))
+
+        context_parts = []
+        for topic, key, doc in blocks:
+            for text in (merge_adjacent(groups[key]) if key else [doc]):
+                context_parts.append(f"--- Context (Topic: {topic}) ---\n{text}\n")
             
-        return "\n".join(context_parts)
+        context = "\n".join(context_parts)
+        self.result_cache.set(cache_key, context)
+        return context
+
+# Singleton, built on first use or by warm_up() from the app lifespan.
+# Loading the embedding model (and ingesting on a fresh DB) takes seconds,
+# so request paths use get_rag_system(wait=False) and fall back to
+# static_context() until it is ready.
+_rag_system: Optional[RAGSystem] = None
+_rag_lock = threading.Lock()
+_rag_ready = threading.Event()
+_rag_error: Optional[Exception] = None
+_warm_up_thread: Optional[threading.Thread] = None
+_warm_up_thread_lock = threading.Lock()  # Not _rag_lock: that one is held for the whole load
+
+
+def is_ready() -> bool:
+    return _rag_ready.is_set()
+
+
+def warm_up() -> Optional[RAGSystem]:
+    """
+    Builds the singleton (blocking). Safe to call from several threads;
+    only the first call does the work. Returns None if initialization failed.
+    """
+    global _rag_system, _rag_error
+    if _rag_ready.is_set():
+        return _rag_system
+    with _rag_lock:
+        if _rag_ready.is_set() or _rag_error is not None:
+            return _rag_system
+        start = time.perf_counter()
+        try:
+            _rag_system = RAGSystem(
+                batch_size=settings.RAG_EMBED_BATCH_SIZE,
+                chunk_tokens=settings.RAG_CHUNK_TOKENS,
+                chunk_overlap_tokens=settings.RAG_CHUNK_OVERLAP_TOKENS,
+                query_cache_entries=settings.RAG_QUERY_CACHE_MAX_ENTRIES,
+                query_cache_ttl=settings.RAG_QUERY_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"WARNING: RAG initialization failed: {e}")
+            _rag_error = e
+            return None
+        _rag_ready.set()
+        print(f"RAG: Ready in {time.perf_counter() - start:.1f}s")
+    return _rag_system
+
+
+def start_warm_up() -> None:
+    """
+    Starts warm_up() in a background thread if it is not running or done yet.
+    """
+    global _warm_up_thread
+    with _warm_up_thread_lock:
+        if _rag_ready.is_set() or _rag_error is not None:
+            return
+        if _warm_up_thread is not None and _warm_up_thread.is_alive():
+            return
+        _warm_up_thread = threading.Thread(target=warm_up, name="rag-warm-up", daemon=True)
+        _warm_up_thread.start()
+
+
+def get_rag_system(wait: bool = True) -> Optional[RAGSystem]:
+    """
+    Returns the RAG singleton. With wait=False it never blocks: while the
+    system is still loading it triggers the warm-up and returns None.
+    """
+    if _rag_ready.is_set():
+        return _rag_system
+    if not wait:
+        start_warm_up()
+        return None
+    return warm_up()
+
+
+def static_context(topic: str, language: str, max_chars: int = 3000) -> str:
+    """
+    Curriculum text for `topic` straight from TOPIC_DATA, used while the
+    vector store is unavailable. Matches the topic by title or id.
+    """
+    topics = TOPIC_DATA.get(language.lower(), {})
+    wanted = topic.strip().lower()
+    for topic_id, data in topics.items():
+        if wanted in (topic_id.lower(), data.get("title", "").lower()):
+            return f"--- Context (Topic: {data.get('title', topic)}) ---\n{data.get('content', '')[:max_chars]}\n"
+    return ""
+
+
+def stats() -> Dict[str, Any]:
+    data = {
+        "ready": is_ready(),
+        "error": str(_rag_error) if _rag_error is not None else None,
+    }
+    if _rag_system is not None:
+        data["version"] = _rag_system.version[:12]
+        data["embedding_cache"] = _rag_system.embedding_cache.stats()
+        data["result_cache"] = _rag_system.result_cache.stats()
+    return data
+
 
-# Singleton instance
-rag_system = RAGSystem()
+metrics.register("rag", stats)
@@ -0,0 +1,281 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+
+class LLMPriority(str, Enum):
+    LOW = "LOW"          # Supervisor routing (has a non-LLM fallback)
+    NORMAL = "NORMAL"    # Tutor chat, learning path ordering
+    HIGH = "HIGH"        # Lesson generation, interview turns
+
+
+# Fraction of each bucket a priority class must leave untouched.
+# LOW traffic is shed first so HIGH traffic always finds headroom.
+PRIORITY_RESERVE = {
+    LLMPriority.HIGH: 0.0,
+    LLMPriority.NORMAL: 0.1,
+    LLMPriority.LOW: 0.3,
+}
+
+
+class QuotaExceeded(Exception):
+    """
+    Raised when the local governor refuses a call. The message matches the
+    upstream quota signal so existing `"AI_QUOTA_EXCEEDED" in str(e)` checks apply.
+    """
+    def __init__(self, reason: str = ""):
+        super().__init__("AI_QUOTA_EXCEEDED")
+        self.reason = reason
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose and code
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `capacity` per `period` seconds.
+    """
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def can_acquire(self, amount: float, reserve: float = 0.0) -> bool:
+        with self._lock:
+            self._refill()
+            return self.tokens - amount >= self.capacity * reserve
+
+    def try_acquire(self, amount: float, reserve: float = 0.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens - amount >= self.capacity * reserve:
+                self.tokens -= amount
+                return True
+            return False
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        with self._lock:
+            self._refill()
+            deficit = amount + self.capacity * reserve - self.tokens
+            return max(0.0, deficit / self.rate) if self.rate else float("inf")
+
+    def consume(self, amount: float) -> None:
+        """
+        Charges usage that was only known after the fact; may go into debt.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class QuotaGovernor:
+    """
+    Client-side governor for Gemini calls: requests/minute and tokens/minute
+    buckets, a per-user daily token budget, and priority-aware shedding.
+    LOW priority calls are shed immediately when over budget; NORMAL and HIGH
+    calls queue for up to `max_wait` seconds before giving up.
+    """
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        user_daily_tokens: int = 0,
+        max_wait: float = 10.0,
+        cooldown: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.user_daily_tokens = user_daily_tokens
+        self.max_wait = max_wait
+        self.cooldown = cooldown
+        self.cooldown_until = 0.0
+        self._usage: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.shed = 0
+
+    # --- Per-user daily budget ---
+
+    def _user_used(self, user: Optional[str]) -> int:
+        if not user:
+            return 0
+        today = datetime.utcnow().date().isoformat()
+        entry = self._usage.get(user)
+        if not entry or entry["date"] != today:
+            return 0
+        return entry["tokens"]
+
+    def _charge_user(self, user: Optional[str], tokens: int) -> None:
+        if not user:
+            return
+        today = datetime.utcnow().date().isoformat()
+        with self._lock:
+            entry = self._usage.get(user)
+            if not entry or entry["date"] != today:
+                # Drop yesterday's counters before tracking a new user-day
+                stale = [u for u, e in self._usage.items() if e["date"] != today]
+                for u in stale:
+                    del self._usage[u]
+                entry = {"date": today, "tokens": 0}
+                self._usage[user] = entry
+            entry["tokens"] += tokens
+
+    def user_remaining(self, user: Optional[str]) -> Optional[int]:
+        if not self.user_daily_tokens or not user:
+            return None
+        return max(0, self.user_daily_tokens - self._user_used(user))
+
+    # --- Admission ---
+
+    def _check(self, tokens: int, priority: LLMPriority, user: Optional[str]) -> Optional[str]:
+        """
+        Returns a reason string if the call can never be admitted right now.
+        """
+        if time.monotonic() < self.cooldown_until:
+            return "upstream quota cooldown"
+        remaining = self.user_remaining(user)
+        if remaining is not None and remaining < tokens:
+            return "daily user budget exhausted"
+        return None
+
+    def _try_admit(self, tokens: int, priority: LLMPriority) -> float:
+        """
+        Attempts to take from both buckets. Returns 0 on success, otherwise
+        the number of seconds to wait before retrying.
+        """
+        reserve = PRIORITY_RESERVE[priority]
+        with self._lock:
+            if self.requests.can_acquire(1, reserve) and self.tokens.can_acquire(tokens, reserve):
+                self.requests.try_acquire(1)
+                self.tokens.try_acquire(tokens)
+                return 0.0
+            return max(
+                self.requests.wait_time(1, reserve),
+                self.tokens.wait_time(tokens, reserve),
+                0.01
+            )
+
+    def _admitted(self, tokens: int, user: Optional[str]) -> None:
+        self._charge_user(user, tokens)
+        self.admitted += 1
+
+    def _reject(self, reason: str, priority: LLMPriority) -> None:
+        self.shed += 1
+        print(f"WARNING: LLM call shed ({priority.value}): {reason}")
+        raise QuotaExceeded(reason)
+
+    def acquire(self, tokens: int, priority: LLMPriority = LLMPriority.NORMAL, user: Optional[str] = None) -> None:
+        reason = self._check(tokens, priority, user)
+        if reason:
+            self._reject(reason, priority)
+
+        deadline = time.monotonic() + (0 if priority == LLMPriority.LOW else self.max_wait)
+        while True:
+            wait = self._try_admit(tokens, priority)
+            if wait == 0:
+                self._admitted(tokens, user)
+                return
+            if time.monotonic() + wait > deadline:
+                self._reject("rate limit", priority)
+            time.sleep(wait)
+
+    def admit_user(self, tokens: int, priority: LLMPriority = LLMPriority.NORMAL, user: Optional[str] = None) -> None:
+        """
+        Per-caller half of `acquire` for calls that share one upstream request:
+        checks and charges the user's daily budget without taking from the
+        shared buckets, which the request itself acquires once.
+        """
+        reason = self._check(tokens, priority, user)
+        if reason:
+            self._reject(reason, priority)
+        self._charge_user(user, tokens)
+
+    def charge_user(self, user: Optional[str], tokens: int) -> None:
+        self._charge_user(user, tokens)
+
+    async def aacquire(self, tokens: int, priority: LLMPriority = LLMPriority.NORMAL, user: Optional[str] = None) -> None:
+        reason = self._check(tokens, priority, user)
+        if reason:
+            self._reject(reason, priority)
+
+        deadline = time.monotonic() + (0 if priority == LLMPriority.LOW else self.max_wait)
+        while True:
+            wait = self._try_admit(tokens, priority)
+            if wait == 0:
+                self._admitted(tokens, user)
+                return
+            if time.monotonic() + wait > deadline:
+                self._reject("rate limit", priority)
+            await asyncio.sleep(wait)
+
+    def record_response(self, response_tokens: int, user: Optional[str] = None) -> None:
+        """
+        Charges the generated tokens once the response size is known.
+        """
+        self.tokens.consume(response_tokens)
+        self._charge_user(user, response_tokens)
+
+    def note_upstream_quota(self) -> None:
+        """
+        Called on an upstream 429: stop sending until the cooldown passes.
+        """
+        self.cooldown_until = time.monotonic() + self.cooldown
+
+    def can_serve(self, priority: LLMPriority = LLMPriority.HIGH, user: Optional[str] = None, tokens: int = 1000) -> bool:
+        """
+        Non-consuming check so callers can degrade before attempting a call.
+        """
+        if self._check(tokens, priority, user):
+            return False
+        reserve = PRIORITY_RESERVE[priority]
+        if priority == LLMPriority.LOW:
+            return self.requests.can_acquire(1, reserve) and self.tokens.can_acquire(tokens, reserve)
+        wait = max(self.requests.wait_time(1, reserve), self.tokens.wait_time(tokens, reserve))
+        return wait <= self.max_wait
+
+    def remaining(self, user: Optional[str] = None) -> Dict[str, Any]:
+        cooldown_left = max(0.0, self.cooldown_until - time.monotonic())
+        return {
+            "requests_available": int(self.requests.available()),
+            "tokens_available": int(self.tokens.available()),
+            "user_tokens_remaining": self.user_remaining(user),
+            "cooldown_seconds": round(cooldown_left, 1),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        data = self.remaining()
+        data.update({
+            "requests_per_minute": int(self.requests.capacity),
+            "tokens_per_minute": int(self.tokens.capacity),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "tracked_users": len(self._usage),
+        })
+        return data
+
+
+quota_governor = QuotaGovernor(
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    user_daily_tokens=settings.LLM_USER_DAILY_TOKENS,
+    max_wait=settings.LLM_QUEUE_MAX_WAIT_SECONDS,
+    cooldown=settings.LLM_QUOTA_COOLDOWN_SECONDS
+)
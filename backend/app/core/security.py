@@ -1,10 +1,26 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import LRUCache
+from app.core import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel while
+# keeping them off the event loop; excess work queues here instead of there.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_stats = {"pending": 0, "completed": 0}
+
+# Claims of recently verified tokens, keyed by sha256(token)
+_token_cache = LRUCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+metrics.register("jwt_cache", _token_cache.stats)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,6 +28,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # True when the hash was made with a different BCRYPT_ROUNDS
+    return pwd_context.needs_update(hashed_password)
+
+async def _run_hash_job(fn, *args):
+    loop = asyncio.get_running_loop()
+    _hash_stats["pending"] += 1
+    try:
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_stats["pending"] -= 1
+        _hash_stats["completed"] += 1
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    return await _run_hash_job(get_password_hash, password)
+
+def password_hash_stats() -> dict:
+    return {"workers": settings.PASSWORD_HASH_WORKERS, "rounds": settings.BCRYPT_ROUNDS, **_hash_stats}
+
+metrics.register("password_hash", password_hash_stats)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -21,3 +61,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def decode_access_token(token: str) -> Mapping[str, Any]:
+    """
+    Verifies `token` and returns its claims (read-only, shared between callers).
+    Tokens seen recently skip signature verification and JSON parsing; a cached
+    entry expires at the token's `exp` or after JWT_CACHE_TTL_SECONDS.
+    Raises jose.JWTError for invalid or expired tokens.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _token_cache.get(key)
+    if claims is not None:
+        exp = claims.get("exp")
+        if exp is None or exp > time.time():
+            return claims
+        # Expired: let jwt.decode raise the proper error
+        _token_cache.delete(key)
+
+    claims = MappingProxyType(jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]))
+    ttl = settings.JWT_CACHE_TTL_SECONDS
+    exp = claims.get("exp")
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _token_cache.set(key, claims, ttl=ttl)
+    return claims
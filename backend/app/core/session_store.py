@@ -0,0 +1,236 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core import metrics
+
+# Role codes used by the compact history encoding
+_ROLE_CODES = {"user": "u", "assistant": "a", "system": "s"}
+_CODE_ROLES = {v: k for k, v in _ROLE_CODES.items()}
+
+# Payloads above this size are zlib-compressed
+_COMPRESS_THRESHOLD = 1024
+
+
+def encode_session(data: Dict[str, Any]) -> bytes:
+    """
+    Serializes a session dict compactly: history turns become [role_code, content]
+    pairs, JSON is written without whitespace and large payloads are compressed.
+    The first byte marks the format ("j" plain JSON, "z" zlib).
+    """
+    compact = dict(data)
+    if "history" in compact:
+        compact["history"] = [
+            [_ROLE_CODES.get(m.get("role", "user"), m.get("role", "user")), m.get("content", "")]
+            for m in compact["history"]
+        ]
+    raw = json.dumps(compact, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) > _COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_session(blob: bytes) -> Dict[str, Any]:
+    marker, body = blob[:1], blob[1:]
+    if marker == b"z":
+        body = zlib.decompress(body)
+    data = json.loads(body.decode("utf-8"))
+    if "history" in data:
+        data["history"] = [
+            {"role": _CODE_ROLES.get(role, role), "content": content}
+            for role, content in data["history"]
+        ]
+    return data
+
+
+class SessionStore(ABC):
+    """
+    Storage for short-lived conversational sessions (e.g. interviews).
+    Sessions expire `ttl` seconds after their last write.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def sweep(self) -> int:
+        """
+        Removes expired sessions, returns how many were dropped.
+        """
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "ttl": self.ttl}
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Per-process LRU + TTL store. Only suitable for a single worker.
+    """
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            blob, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[session_id]
+                return None
+            self._data.move_to_end(session_id)
+        return decode_session(blob)
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        blob = encode_session(data)
+        with self._lock:
+            self._data[session_id] = (blob, time.monotonic() + self.ttl)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._data.pop(session_id, None)
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, expires_at) in self._data.items() if expires_at <= now]
+            for k in expired:
+                del self._data[k]
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        data = super().stats()
+        data.update({"size": len(self._data), "max_entries": self.max_entries})
+        return data
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store (WAL mode) that every worker process on a host can share.
+    """
+    def __init__(self, ttl: float, path: str):
+        super().__init__(ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expiry ON sessions (expires_at)")
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return decode_session(row[0]) if row else None
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        blob = encode_session(data)
+        with self._lock, self._conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, blob, time.time() + self.ttl)
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock, self._conn as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def sweep(self) -> int:
+        with self._lock, self._conn as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        data = super().stats()
+        with self._lock:
+            data["size"] = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        data["path"] = self.path
+        return data
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store for any Redis-compatible server (Redis, Valkey, KeyDB, ...).
+    Expiry is delegated to the server via SETEX, so no sweep is needed.
+    Requires the optional `redis` package.
+    """
+    def __init__(self, ttl: float, url: str, prefix: str = "session:"):
+        super().__init__(ttl)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_STORE_BACKEND=redis requires the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        blob = self.client.get(self.prefix + session_id)
+        return decode_session(blob) if blob else None
+
+    def set(self, session_id: str, data: Dict[str, Any]) -> None:
+        self.client.setex(self.prefix + session_id, int(self.ttl), encode_session(data))
+
+    def delete(self, session_id: str) -> None:
+        self.client.delete(self.prefix + session_id)
+
+
+def create_session_store(backend: str, ttl: float, max_entries: int, path: str, redis_url: str) -> SessionStore:
+    backend = backend.lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(ttl, path)
+    if backend == "redis":
+        return RedisSessionStore(ttl, redis_url)
+    return MemorySessionStore(ttl, max_entries)
+
+
+async def sweep_periodically(store: SessionStore, interval: float) -> None:
+    """
+    Background task (started from the app lifespan) that drops expired sessions.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(store.sweep)
+            if removed:
+                print(f"SessionStore: Swept {removed} expired sessions.")
+        except Exception as e:
+            print(f"WARNING: Session sweep failed: {e}")
+
+
+interview_sessions = create_session_store(
+    backend=settings.SESSION_STORE_BACKEND,
+    ttl=settings.SESSION_TTL_SECONDS,
+    max_entries=settings.SESSION_MAX_ENTRIES,
+    path=settings.SESSION_DB_PATH,
+    redis_url=settings.SESSION_REDIS_URL
+)
+metrics.register("interview_sessions", interview_sessions.stats)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _FlightStats:
+    def __init__(self):
+        self.calls = 0
+        self.leaders = 0
+        self.coalesced = 0
+        # key -> the in-flight call (a _Call or an asyncio.Task)
+        self._in_flight: Dict[str, Any] = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalescing_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+class SingleFlight(_FlightStats):
+    """
+    Collapses concurrent calls with the same key into one execution.
+    The first caller (leader) runs `fn`; callers arriving while it is in
+    flight block and receive the same result or exception.
+    """
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            if call is None:
+                call = _Call()
+                self._in_flight[key] = call
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight(_FlightStats):
+    """
+    asyncio version of SingleFlight. The leader's coroutine runs as a task
+    so one caller being cancelled does not cancel it for everyone else.
+    """
+    async def do(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(coro_fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _t: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
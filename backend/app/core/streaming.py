@@ -0,0 +1,67 @@
+import asyncio
+from typing import AsyncIterator
+
+_DONE = object()
+
+
+async def batch_chunks(source: AsyncIterator[str], max_chars: int = 48, max_delay: float = 0.04) -> AsyncIterator[str]:
+    """
+    Coalesces sub-frame chunks from `source` into larger frames.
+    A frame is flushed once it reaches `max_chars` or `max_delay` seconds after
+    its first chunk arrived, whichever comes first.
+
+    The source is drained by a pump task through an asyncio.Queue so the flush
+    timer never has to cancel a pending __anext__. Closing this generator (or
+    cancelling its consumer) cancels the pump, which aborts the upstream stream.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for chunk in source:
+                queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(_DONE)
+
+    task = asyncio.create_task(pump())
+    buffer = []
+    size = 0
+    deadline = 0.0
+    try:
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(item)
+            size += len(item)
+            if size >= max_chars:
+                yield "".join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
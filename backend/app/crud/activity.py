@@ -1,7 +1,13 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.crud.base import CRUDBase
 from pydantic import BaseModel
 from datetime import datetime
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+
+# Size of the per-user "recent activities" ring buffer doc (dashboard fast path)
+RECENT_CAP = 20
+RECENT_COLLECTION = "userActivityRecent"
 
 class ActivityCreate(BaseModel):
     user_id: str
@@ -38,37 +44,80 @@ class CRUDActivity(CRUDBase[BaseModel, ActivityCreate, BaseModel]):
         }
         
         # Use direct Firestore set instead of CRUD create to avoid BaseModel issues
-        from app.db.firestore import get_db
-        db = get_db()
         doc_ref = self.collection.document()
-        doc_ref.set(activity_data)
+        recent_ref = self.db.collection(RECENT_COLLECTION).document(user_id)
+
+        # The activity doc and the capped recent buffer are written together
+        @firestore.transactional
+        def _apply(transaction):
+            snapshot = recent_ref.get(transaction=transaction)
+            if snapshot.exists:
+                items = snapshot.to_dict().get("items", [])
+            else:
+                # First write since the buffer was introduced: seed it from
+                # the user's existing history so older entries stay visible
+                items = []
+                for doc in self._query(user_id).limit(RECENT_CAP - 1).stream(transaction=transaction):
+                    items.append(dict(doc.to_dict(), id=doc.id))
+            transaction.set(doc_ref, activity_data)
+            entry = dict(activity_data, id=doc_ref.id)
+            transaction.set(recent_ref, {"items": [entry] + items[:RECENT_CAP - 1]})
+
+        _apply(self.db.transaction())
         
         activity_data['id'] = doc_ref.id
         return activity_data
-    
-    def get_recent_activities(self, user_id: str, limit: int = 6) -> List[dict]:
+
+    def _query(self, user_id: str):
+        # Needs the (user_id ASC, timestamp DESC) composite index in firestore.indexes.json
+        return (
+            self.collection
+            .where("user_id", "==", user_id)
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+        )
+
+    def get_activity_page(self, user_id: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
         """
-        Get the most recent activities for a user.
-        Fetches all activities and sorts in Python to avoid Firestore index requirements.
+        One page of the activity feed, newest first.
+        `cursor` is the ID of the last activity of the previous page; the returned
+        cursor is None when there are no more pages.
         """
-        from app.db.firestore import get_db
-        db = get_db()
-        
-        # Fetch all activities for this user
-        query = self.collection.where("user_id", "==", user_id)
-        docs = list(query.stream())
-        
-        # Convert to list of dicts
+        query = self._query(user_id)
+        if cursor:
+            last = self.collection.document(cursor).get()
+            if not last.exists or last.to_dict().get("user_id") != user_id:
+                return [], None
+            query = query.start_after(last)
+
         activities = []
-        for doc in docs:
+        for doc in query.limit(limit).stream():
             data = doc.to_dict()
             data['id'] = doc.id
             activities.append(data)
-        
-        # Sort by timestamp (most recent first)
-        activities.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        
-        # Return only the requested number
+
+        next_cursor = activities[-1]['id'] if len(activities) == limit else None
+        return activities, next_cursor
+    
+    def get_recent_activities(self, user_id: str, limit: int = 6) -> List[dict]:
+        """
+        Get the most recent activities for a user.
+        Served from the capped recent buffer doc (one read); users that predate
+        it fall back to the indexed query, which also seeds the buffer.
+        """
+        recent_ref = self.db.collection(RECENT_COLLECTION).document(user_id)
+        if limit <= RECENT_CAP:
+            snapshot = recent_ref.get()
+            if snapshot.exists:
+                return snapshot.to_dict().get("items", [])[:limit]
+
+        activities, _ = self.get_activity_page(user_id, limit=max(limit, RECENT_CAP))
+        if activities:
+            try:
+                # Only if still missing: a concurrent log_activity may have
+                # created the buffer with a newer entry since the query ran
+                recent_ref.create({"items": activities[:RECENT_CAP]})
+            except AlreadyExists:
+                pass
         return activities[:limit]
 
 # Create singleton instance
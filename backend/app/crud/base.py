@@ -25,6 +25,17 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return doc.to_dict()
         return None
 
+    def get_many(self, ids: List[str], field_paths: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetches several documents by ID in one batched round trip (db.get_all).
+        `field_paths` limits the returned fields. Missing documents are omitted.
+        """
+        if not ids:
+            return {}
+        refs = [self.collection.document(id) for id in dict.fromkeys(ids)]
+        docs = self.db.get_all(refs, field_paths=field_paths)
+        return {doc.id: doc.to_dict() for doc in docs if doc.exists}
+
     def get_multi(self, limit: int = 100) -> List[Dict[str, Any]]:
         docs = self.collection.limit(limit).stream()
         return [doc.to_dict() for doc in docs]
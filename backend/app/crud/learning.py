@@ -1,5 +1,8 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from google.cloud import firestore
 from app.crud.base import CRUDBase
+from app.crud.progress_summary import progress_summary
 from app.models.enums import TopicStatus
 from pydantic import BaseModel
 
@@ -24,6 +27,15 @@ class CRUDTopicProgress(CRUDBase[BaseModel, TopicProgressCreate, TopicProgressUp
     def get_progress(self, user_id: str, topic_id: str) -> Optional[dict]:
         return self.get(f"{user_id}_{topic_id}")
 
+    def get_progress_bulk(self, user_id: str, topic_ids: List[str], field_paths: Optional[List[str]] = None) -> Dict[str, dict]:
+        """
+        Progress for many topics in one round trip, keyed by topic_id.
+        Topics without a progress document are omitted.
+        """
+        prefix = f"{user_id}_"
+        docs = self.get_many([prefix + t_id for t_id in topic_ids], field_paths=field_paths)
+        return {doc_id[len(prefix):]: data for doc_id, data in docs.items()}
+
     def update_status(self, user_id: str, topic_id: str, status: TopicStatus) -> dict:
         doc_id = f"{user_id}_{topic_id}"
         # We need to create if not exists, or update
@@ -40,5 +52,44 @@ class CRUDTopicProgress(CRUDBase[BaseModel, TopicProgressCreate, TopicProgressUp
             curr["status"] = status.value
             return curr
 
+    def record_attempt(
+        self,
+        user_id: str,
+        topic_id: str,
+        language: str,
+        status: TopicStatus,
+        score: Any,
+        topic_title: str,
+        level: Optional[str] = None
+    ) -> dict:
+        """
+        Saves a quiz attempt and updates the user's progressSummaries doc in the
+        same transaction, so the dashboard counters never drift from raw progress.
+        """
+        doc_ref = self.collection.document(f"{user_id}_{topic_id}")
+
+        @firestore.transactional
+        def _apply(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            curr = snapshot.to_dict() if snapshot.exists else None
+            # All reads before the first write (Firestore transaction rule)
+            seed = progress_summary.seed_if_missing(transaction, user_id)
+            data = {
+                "user_id": user_id,
+                "topic_id": topic_id,
+                "topic_title": topic_title,
+                "language": language,
+                "level": level or (curr or {}).get("level"),
+                "status": status.value,
+                "last_score": score,
+                "attempts": (curr or {}).get("attempts", 0) + 1,
+                "updatedAt": datetime.utcnow().isoformat()
+            }
+            transaction.set(doc_ref, data, merge=True)
+            progress_summary.apply_transition(transaction, user_id, curr, data, topic_title, seed=seed)
+            return data
+
+        return _apply(self.db.transaction())
+
 learning_path = CRUDLearningPath("learningPaths")
 topic_progress = CRUDTopicProgress("topicProgress")
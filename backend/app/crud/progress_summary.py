@@ -0,0 +1,171 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from google.cloud import firestore
+from pydantic import BaseModel
+from app.crud.base import CRUDBase
+from app.models.enums import TopicStatus
+
+# Counters kept for every language / level bucket
+COUNTERS = ("attempted", "mastered", "weak")
+UNASSIGNED_LEVEL = "unassigned"
+
+
+def normalize_status(status: Any) -> str:
+    # Older progress docs stored the enum repr ("TopicStatus.MASTERED")
+    value = getattr(status, "value", status) or TopicStatus.NOT_ATTEMPTED.value
+    return str(value).replace("TopicStatus.", "")
+
+
+def contribution(status: Any) -> Dict[str, int]:
+    """
+    What one topic progress doc adds to the counters.
+    """
+    status = normalize_status(status)
+    return {
+        "attempted": 1,
+        "mastered": int(status == TopicStatus.MASTERED.value),
+        "weak": int(status == TopicStatus.WEAK.value),
+    }
+
+
+class CRUDProgressSummary(CRUDBase[BaseModel, BaseModel, BaseModel]):
+    """
+    One aggregate doc per user (ID = user_id) so the dashboard needs a single read:
+
+        totals:    {attempted, mastered, weak}
+        languages: {lang: {attempted, mastered, weak, levels: {level: {...}}}}
+        lastTopicId / lastTopicTitle / lastLanguage / updatedAt
+
+    Kept in sync by `apply_transition` inside the quiz submission transaction
+    (seeded from raw progress on a user's first attempt after it was
+    introduced); `rebuild` regenerates it from raw topicProgress docs.
+    """
+    def get_summary(self, user_id: str) -> Optional[dict]:
+        return self.get(user_id)
+
+    def _deltas(self, old: Optional[dict], new: dict) -> Dict[str, Any]:
+        # Remove the old doc's contribution from its buckets, add the new one's
+        deltas: Dict[str, Any] = {"totals": {}, "languages": {}}
+
+        def add(progress: dict, sign: int):
+            counts = contribution(progress.get("status"))
+            lang = progress.get("language") or progress.get("topic_id", "").split("_", 1)[0]
+            level = progress.get("level") or UNASSIGNED_LEVEL
+            lang_bucket = deltas["languages"].setdefault(lang, {"levels": {}})
+            level_bucket = lang_bucket["levels"].setdefault(level, {})
+            for bucket in (deltas["totals"], lang_bucket, level_bucket):
+                for name in COUNTERS:
+                    bucket[name] = bucket.get(name, 0) + sign * counts[name]
+
+        if old:
+            add(old, -1)
+        add(new, 1)
+        return deltas
+
+    def _as_increments(self, deltas: Dict[str, Any]) -> Dict[str, Any]:
+        out = {}
+        for key, value in deltas.items():
+            if isinstance(value, dict):
+                nested = self._as_increments(value)
+                if nested:
+                    out[key] = nested
+            elif value:
+                out[key] = firestore.Increment(value)
+        return out
+
+    def _add_deltas(self, target: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+        for key, value in deltas.items():
+            if isinstance(value, dict):
+                self._add_deltas(target.setdefault(key, {}), value)
+            else:
+                target[key] = target.get(key, 0) + value
+
+    def seed_if_missing(self, transaction, user_id: str) -> Optional[dict]:
+        """
+        Transactional read step for `apply_transition`: returns None if the
+        user's summary exists, otherwise the summary computed from their
+        existing topicProgress docs (read in the same transaction, so before
+        the new attempt is written). Must run before any transaction write.
+        """
+        snapshot = self.collection.document(user_id).get(transaction=transaction)
+        if snapshot.exists:
+            return None
+        return self._compute(user_id, transaction=transaction)
+
+    def apply_transition(
+        self,
+        transaction,
+        user_id: str,
+        old: Optional[dict],
+        new: dict,
+        topic_title: str,
+        seed: Optional[dict] = None
+    ) -> None:
+        """
+        Queues the counter changes for one progress doc going from `old`
+        (None if it did not exist) to `new`. Both need "status" and "language",
+        and optionally "level".
+
+        With `seed` (from `seed_if_missing`, the user has no summary yet) the
+        full doc is written; otherwise server-side increments are merged in.
+        """
+        deltas = self._deltas(old, new)
+        meta = {
+            "user_id": user_id,
+            "lastTopicId": new.get("topic_id"),
+            "lastTopicTitle": topic_title,
+            "lastLanguage": new.get("language"),
+            "updatedAt": datetime.utcnow().isoformat()
+        }
+        if seed is not None:
+            self._add_deltas(seed, deltas)
+            seed.update(meta)
+            transaction.set(self.collection.document(user_id), seed)
+            return
+        data = self._as_increments(deltas)
+        data.update(meta)
+        transaction.set(self.collection.document(user_id), data, merge=True)
+
+    def _compute(self, user_id: str, transaction=None) -> dict:
+        summary: Dict[str, Any] = {
+            "user_id": user_id,
+            "totals": {name: 0 for name in COUNTERS},
+            "languages": {},
+        }
+        latest = None
+        docs = self.db.collection("topicProgress").where("user_id", "==", user_id).stream(transaction=transaction)
+        for doc in docs:
+            progress = doc.to_dict()
+            topic_id = progress.get("topic_id", "")
+            lang = progress.get("language") or topic_id.split("_", 1)[0]
+            level = progress.get("level") or UNASSIGNED_LEVEL
+            counts = contribution(progress.get("status"))
+
+            lang_bucket = summary["languages"].setdefault(lang, {name: 0 for name in COUNTERS})
+            level_bucket = lang_bucket.setdefault("levels", {}).setdefault(level, {name: 0 for name in COUNTERS})
+            for bucket in (summary["totals"], lang_bucket, level_bucket):
+                for name in COUNTERS:
+                    bucket[name] += counts[name]
+
+            if latest is None or progress.get("updatedAt", "") > latest.get("updatedAt", ""):
+                latest = dict(progress, language=lang)
+
+        if latest:
+            summary.update({
+                "lastTopicId": latest.get("topic_id"),
+                "lastTopicTitle": latest.get("topic_title") or latest.get("topic_id", "").replace("_", " "),
+                "lastLanguage": latest.get("language"),
+            })
+        summary["updatedAt"] = datetime.utcnow().isoformat()
+        return summary
+
+    def rebuild(self, user_id: str) -> dict:
+        """
+        Recomputes the summary from every topicProgress doc of the user.
+        """
+        summary = self._compute(user_id)
+        self.collection.document(user_id).set(summary)
+        return summary
+
+
+progress_summary = CRUDProgressSummary("progressSummaries")
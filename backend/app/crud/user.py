@@ -1,5 +1,10 @@
-from typing import Optional
+import threading
+from typing import Any, Dict, Optional
 from app.crud.base import CRUDBase
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.core import metrics
 from app.models.user import UserCreate, UserUpdate, UserBase # Assuming these exist or using Dict for now as generic
 # Check app/models/user.py first? Yes I should but for now I will assume Pydantic integration or use loose typing
 from pydantic import BaseModel
@@ -8,8 +13,65 @@ from pydantic import BaseModel
 # I saw app/models/user.py exists.
 
 class CRUDUser(CRUDBase[BaseModel, BaseModel, BaseModel]):
+    """
+    get_by_email is read-through cached for a short TTL since every
+    authenticated request looks the user up. Concurrent misses for the same
+    email share one Firestore read. Writes made through this class invalidate
+    the entry; code writing user docs directly must call `invalidate`.
+    """
+    def __init__(self, collection_name: str, cache_ttl: int = 30, cache_max_entries: int = 5000):
+        super().__init__(collection_name)
+        self.cache_ttl = cache_ttl
+        self._cache = LRUCache(max_entries=cache_max_entries, default_ttl=cache_ttl)
+        self._flight = SingleFlight()
+        # Bumped on every invalidation so a read that raced with a write is not cached
+        self._generation = 0
+        self._gen_lock = threading.Lock()
+
     def get_by_email(self, email: str) -> Optional[dict]:
-        return self.get(email) # In our design, email IS the document ID for simplicity
+        if not self.cache_ttl:
+            return self.get(email) # In our design, email IS the document ID for simplicity
+
+        cached = self._cache.get(email)
+        if cached is not None:
+            return dict(cached)
+
+        def load() -> Optional[dict]:
+            # The generation is taken by whoever actually reads, right before
+            # the read; callers that join the flight later must not use their own
+            generation = self._generation
+            user_doc = self.get(email)
+            if user_doc is not None:
+                with self._gen_lock:
+                    if generation == self._generation:
+                        self._cache.set(email, user_doc)
+            return user_doc
+
+        user_doc = self._flight.do(email, load)
+        return dict(user_doc) if user_doc is not None else None
+
+    def invalidate(self, email: str) -> None:
+        with self._gen_lock:
+            self._generation += 1
+            self._cache.delete(email)
+
+    def create(self, obj_in: Any, id: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            return super().create(obj_in, id=id)
+        finally:
+            if id:
+                self.invalidate(id)
+
+    def update(self, id: str, obj_in: Any) -> Dict[str, Any]:
+        try:
+            return super().update(id, obj_in)
+        finally:
+            self.invalidate(id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        data = self._cache.stats()
+        data["single_flight"] = self._flight.stats()
+        return data
 
     def update_gamification_stats(self, email: str, xp_gained: int = 0) -> dict:
         """
@@ -55,4 +117,9 @@ class CRUDUser(CRUDBase[BaseModel, BaseModel, BaseModel]):
         self.update(email, update_data)
         return update_data
 
-user = CRUDUser("users")
+user = CRUDUser(
+    "users",
+    cache_ttl=settings.USER_CACHE_TTL_SECONDS,
+    cache_max_entries=settings.USER_CACHE_MAX_ENTRIES
+)
+metrics.register("user_cache", user.cache_stats)
@@ -0,0 +1,132 @@
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class ExecutionUnavailable(Exception):
+    """
+    The execution backend cannot run code right now (upstream down, sandbox
+    tool missing, ...). The API turns this into a 503.
+    """
+
+
+class UnsupportedLanguage(ValueError):
+    pass
+
+
+class RunLimits(NamedTuple):
+    """
+    Per-run overrides of the backend's default limits (None keeps the default).
+    """
+    time_limit_ms: Optional[int] = None
+    memory_limit_mb: Optional[int] = None
+
+
+def run_result(stdout: str = "", stderr: str = "", code: Any = None, signal: Any = None, **extra) -> Dict[str, Any]:
+    """
+    Builds a stage result ("run" / "compile") in the Piston response shape.
+    """
+    result = {
+        "stdout": stdout,
+        "stderr": stderr,
+        "output": stdout + stderr,
+        "code": code,
+        "signal": signal,
+    }
+    result.update(extra)
+    return result
+
+
+class ExecutionBackend(ABC):
+    """
+    Runs a single source file with optional stdin.
+
+    `run` returns the Piston response shape so callers do not care which
+    backend is active:
+
+        {"language": ..., "version": ..., "run": {"stdout", "stderr", "output", "code", "signal", ...}}
+
+    plus a "compile" stage for compiled languages.
+
+    `run_many` fans several stdins for the same code out over a shared thread
+    pool of `max_workers` (each local run is its own process, each Piston run
+    an HTTP call, so threads are enough either way).
+    """
+    name = "base"
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"exec-{self.name}")
+        return self._executor
+
+    @abstractmethod
+    def run(self, language: str, code: str, stdin: str = "", limits: Optional[RunLimits] = None) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def runtime_version(self, language: str) -> str:
+        ...
+
+    @property
+    def uncached(self) -> "ExecutionBackend":
+        """
+        The backend without any result cache in front of it.
+        """
+        return self
+
+    def warm_up(self) -> None:
+        """
+        Called once at startup (off the event loop) to pre-start resources.
+        """
+
+    def run_many(
+        self,
+        language: str,
+        code: str,
+        stdins: List[str],
+        concurrency: int = 4,
+        check: Optional[Callable[[int, Dict[str, Any]], bool]] = None,
+        stop_on_failure: bool = False,
+        limits: Optional[RunLimits] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Runs `code` once per stdin with at most `concurrency` runs in flight and
+        returns the results in input order.
+
+        With `stop_on_failure`, no new run is started once `check(index, result)`
+        returns False; runs already in flight finish, the rest stay None.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(stdins)
+        pending: Dict[Future, int] = {}
+        next_index = 0
+        stopped = False
+        try:
+            while pending or (not stopped and next_index < len(stdins)):
+                while not stopped and next_index < len(stdins) and len(pending) < max(1, concurrency):
+                    future = self.executor.submit(self.run, language, code, stdins[next_index], limits)
+                    pending[future] = next_index
+                    next_index += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    results[index] = future.result()
+                    if stop_on_failure and check is not None and not check(index, results[index]):
+                        stopped = True
+        finally:
+            # On error, don't leave queued runs behind
+            for future in pending:
+                future.cancel()
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
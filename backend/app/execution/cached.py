@@ -0,0 +1,74 @@
+import copy
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from app.core.cache import LRUCache, make_key
+from app.core.singleflight import SingleFlight
+from app.execution.base import ExecutionBackend, RunLimits
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedExecutionBackend(ExecutionBackend):
+    """
+    Wraps a backend with a result cache for repeated runs of unchanged code.
+
+    Entries are keyed on (language, runtime version, source digest, stdin
+    digest, run limits). Identical runs already in flight are collapsed
+    into one. Results that depend on timing or load are never stored: timeouts,
+    SIGKILLed runs, oversized outputs. Callers that need a fresh run (the
+    program is nondeterministic) use `uncached`.
+    """
+    def __init__(self, backend: ExecutionBackend, max_entries: int = 1000, ttl: float = 600, max_output_bytes: int = 65536):
+        super().__init__(backend.max_workers)
+        self.name = backend.name
+        self.backend = backend
+        self.max_output_bytes = max_output_bytes
+        self._cache = LRUCache(max_entries=max_entries, default_ttl=ttl)
+        self._flight = SingleFlight()
+        self.skipped = 0
+
+    @property
+    def uncached(self) -> ExecutionBackend:
+        return self.backend
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Share the wrapped backend's pool so cached and uncached runs are bounded together
+        return self.backend.executor
+
+    def runtime_version(self, language: str) -> str:
+        return self.backend.runtime_version(language)
+
+    def warm_up(self) -> None:
+        self.backend.warm_up()
+
+    def _cacheable(self, result: Dict[str, Any]) -> bool:
+        run = result.get("run") or {}
+        if run.get("status") == "TO" or run.get("signal") == "SIGKILL":
+            return False
+        return len(run.get("stdout") or "") + len(run.get("stderr") or "") <= self.max_output_bytes
+
+    def run(self, language: str, code: str, stdin: str = "", limits: Optional[RunLimits] = None) -> Dict[str, Any]:
+        key = make_key(language.lower(), self.backend.runtime_version(language), _digest(code), _digest(stdin), tuple(limits or RunLimits()))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        def execute() -> Dict[str, Any]:
+            result = self.backend.run(language, code, stdin, limits)
+            if self._cacheable(result):
+                self._cache.set(key, copy.deepcopy(result))
+            else:
+                self.skipped += 1
+            return result
+
+        # Followers share the leader's dict, hand each caller its own copy
+        return copy.deepcopy(self._flight.do(key, execute))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.backend.stats()
+        stats["result_cache"] = dict(self._cache.stats(), not_cached=self.skipped, dedupe=self._flight.stats())
+        return stats
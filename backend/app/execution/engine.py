@@ -0,0 +1,49 @@
+from app.core.config import settings
+from app.core import metrics
+from app.execution.base import ExecutionBackend
+from app.execution.cached import CachedExecutionBackend
+from app.execution.local_sandbox import LocalSandboxBackend, SandboxLimits
+from app.execution.piston import PistonBackend
+
+
+def _create_backend(backend: str) -> ExecutionBackend:
+    backend = backend.lower()
+    if backend == "local":
+        limits = SandboxLimits(
+            wall_seconds=settings.SANDBOX_WALL_TIMEOUT_SECONDS,
+            cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+            memory_mb=settings.SANDBOX_MEMORY_MB,
+            max_processes=settings.SANDBOX_MAX_PROCESSES,
+            max_output_kb=settings.SANDBOX_MAX_OUTPUT_KB,
+            compile_seconds=settings.SANDBOX_COMPILE_TIMEOUT_SECONDS,
+            build_cache_entries=settings.SANDBOX_BUILD_CACHE_ENTRIES,
+            python_pool_size=settings.SANDBOX_PYTHON_POOL_SIZE,
+            python_pool_max_runs=settings.SANDBOX_PYTHON_POOL_MAX_RUNS
+        )
+        return LocalSandboxBackend(limits, workdir_root=settings.SANDBOX_WORKDIR, max_workers=settings.EXECUTION_MAX_WORKERS)
+    return PistonBackend(
+        settings.PISTON_URL,
+        max_workers=settings.EXECUTION_MAX_WORKERS,
+        connect_timeout=settings.PISTON_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.PISTON_READ_TIMEOUT_SECONDS,
+        retries=settings.PISTON_MAX_RETRIES,
+        backoff_seconds=settings.PISTON_RETRY_BACKOFF_SECONDS,
+        failure_threshold=settings.PISTON_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.PISTON_CIRCUIT_RESET_SECONDS
+    )
+
+
+def create_execution_backend(backend: str) -> ExecutionBackend:
+    inner = _create_backend(backend)
+    if settings.EXECUTION_CACHE_MAX_ENTRIES <= 0:
+        return inner
+    return CachedExecutionBackend(
+        inner,
+        max_entries=settings.EXECUTION_CACHE_MAX_ENTRIES,
+        ttl=settings.EXECUTION_CACHE_TTL_SECONDS,
+        max_output_bytes=settings.SANDBOX_MAX_OUTPUT_KB * 1024
+    )
+
+
+execution_backend = create_execution_backend(settings.EXECUTION_BACKEND)
+metrics.register("execution", execution_backend.stats)
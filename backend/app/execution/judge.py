@@ -0,0 +1,333 @@
+import ast
+import json
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.execution.base import ExecutionBackend, RunLimits
+
+# Marks the harness's result line so the solution's own prints are ignored
+RESULT_MARKER = "@@JUDGE_RESULT@@"
+
+ACCEPTED = "Accepted"
+WRONG_ANSWER = "Wrong Answer"
+TIME_LIMIT = "Time Limit Exceeded"
+MEMORY_LIMIT = "Memory Limit Exceeded"
+OUTPUT_LIMIT = "Output Limit Exceeded"
+RUNTIME_ERROR = "Runtime Error"
+COMPILE_ERROR = "Compilation Error"
+
+
+class JudgeError(Exception):
+    """
+    The problem or submission cannot be judged (unsupported signature, ...).
+    """
+
+
+class TestVerdict(NamedTuple):
+    index: int
+    status: str
+    cpu_time: Optional[int]     # ms, None if the backend does not measure it
+    memory: Optional[int]       # bytes
+    expected: Any
+    actual: Any
+    message: str = ""
+
+
+# --- Test case parsing -------------------------------------------------------
+
+def parse_arguments(raw: str) -> List[Tuple[str, Any]]:
+    """
+    "nums = [2,7,11,15], target = 9" -> [("nums", [2, 7, 11, 15]), ("target", 9)]
+    """
+    try:
+        call = ast.parse(f"_f({raw})", mode="eval").body
+        return [(kw.arg, ast.literal_eval(kw.value)) for kw in call.keywords]
+    except (SyntaxError, ValueError) as e:
+        raise JudgeError(f"Cannot parse test input {raw!r}: {e}")
+
+
+def parse_expected(raw: str) -> Any:
+    try:
+        return ast.literal_eval(raw.strip())
+    except (SyntaxError, ValueError):
+        return raw.strip()
+
+
+def values_match(expected: Any, actual: Any, tolerance: float = 1e-5) -> bool:
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return expected is actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return math.isclose(expected, actual, rel_tol=tolerance, abs_tol=tolerance)
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        return len(expected) == len(actual) and all(values_match(e, a, tolerance) for e, a in zip(expected, actual))
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(values_match(expected[k], actual[k], tolerance) for k in expected)
+    return expected == actual
+
+
+# --- Harnesses ---------------------------------------------------------------
+# Every harness embeds all test cases and reads the case index from stdin, so
+# one source serves every test (Java compiles once, see LocalSandboxBackend).
+
+def python_method_name(starter_code: str) -> str:
+    match = re.search(r"class Solution\b.*?\n\s+def (\w+)\(self", starter_code, re.S)
+    if not match:
+        raise JudgeError("Python starter code has no Solution method")
+    return match.group(1)
+
+
+def build_python_harness(code: str, method: str, cases: List[List[Tuple[str, Any]]]) -> str:
+    # The submission is executed as a module named "solution" so its own
+    # `if __name__ == '__main__'` driver does not run. Arguments are passed
+    # positionally in the problem's order, so parameter names may differ.
+    return f"""import json as _judge_json
+import sys as _judge_sys
+
+_CASES = {[[value for _, value in args] for args in cases]!r}
+_SOURCE = {code!r}
+
+_solution = {{"__name__": "solution"}}
+exec(compile(_SOURCE, "solution.py", "exec"), _solution)
+_args = _CASES[int(_judge_sys.stdin.read().strip())]
+_result = _solution["Solution"]().{method}(*_args)
+_judge_sys.stdout.flush()
+print("\\n{RESULT_MARKER}" + _judge_json.dumps(_result))
+"""
+
+
+class JavaSignature(NamedTuple):
+    return_type: str
+    method: str
+    param_types: List[str]
+
+
+def _split_params(params: str) -> List[str]:
+    parts, depth, current = [], 0, ""
+    for ch in params:
+        if ch == "<":
+            depth += 1
+        elif ch == ">":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current)
+    # Drop the parameter names, keep the types
+    return [part.strip().rsplit(" ", 1)[0].strip() for part in parts]
+
+
+def java_signature(starter_code: str) -> JavaSignature:
+    match = re.search(r"class Solution\b[^{]*\{.*?public\s+([\w<>\[\], ]+?)\s+(\w+)\s*\(([^)]*)\)", starter_code, re.S)
+    if not match:
+        raise JudgeError("Java starter code has no public Solution method")
+    return JavaSignature(match.group(1).strip(), match.group(2), _split_params(match.group(3)))
+
+
+def java_literal(value: Any, java_type: str) -> str:
+    java_type = java_type.replace(" ", "")
+    if java_type.endswith("[]"):
+        element = java_type[:-2]
+        return f"new {java_type}{{{', '.join(java_literal(v, element) for v in value)}}}"
+    generic = re.match(r"(?:java\.util\.)?(List|ArrayList)<(.+)>$", java_type)
+    if generic:
+        element = generic.group(2)
+        items = ", ".join(java_literal(v, element) for v in value)
+        return f"new java.util.ArrayList<{element}>(java.util.Arrays.<{element}>asList({items}))"
+    if java_type in ("int", "Integer", "short", "byte"):
+        return str(int(value))
+    if java_type in ("long", "Long"):
+        return f"{int(value)}L"
+    if java_type in ("double", "Double"):
+        return repr(float(value))
+    if java_type in ("float", "Float"):
+        return f"{float(value)!r}f"
+    if java_type in ("boolean", "Boolean"):
+        return "true" if value else "false"
+    if java_type in ("char", "Character"):
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if java_type == "String":
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+        return f'"{escaped}"'
+    raise JudgeError(f"Unsupported Java parameter type: {java_type}")
+
+
+_JAVA_SERIALIZER = r"""
+    static String ser(Object o) {
+        if (o == null) return "null";
+        if (o instanceof String) return "\"" + ((String) o).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") + "\"";
+        if (o instanceof Character) return ser(String.valueOf(o));
+        if (o instanceof Double || o instanceof Float) {
+            double d = ((Number) o).doubleValue();
+            return (Double.isNaN(d) || Double.isInfinite(d)) ? "null" : Double.toString(d);
+        }
+        if (o instanceof Number || o instanceof Boolean) return o.toString();
+        if (o instanceof Iterable) {
+            StringBuilder sb = new StringBuilder("[");
+            for (Object item : (Iterable<?>) o) { if (sb.length() > 1) sb.append(","); sb.append(ser(item)); }
+            return sb.append("]").toString();
+        }
+        if (o.getClass().isArray()) {
+            StringBuilder sb = new StringBuilder("[");
+            int n = java.lang.reflect.Array.getLength(o);
+            for (int i = 0; i < n; i++) { if (i > 0) sb.append(","); sb.append(ser(java.lang.reflect.Array.get(o, i))); }
+            return sb.append("]").toString();
+        }
+        return ser(o.toString());
+    }
+"""
+
+
+def build_java_harness(code: str, signature: JavaSignature, cases: List[List[Tuple[str, Any]]]) -> str:
+    # The submission's own Main (its driver) is renamed so ours is the entry point
+    user_code = re.sub(r"\bpublic\s+class\s+Main\b", "class UserMain", code)
+    user_code = re.sub(r"\bclass\s+Main\b", "class UserMain", user_code)
+
+    branches = []
+    for index, args in enumerate(cases):
+        if len(args) != len(signature.param_types):
+            raise JudgeError(f"Test {index + 1} has {len(args)} arguments, {signature.method} takes {len(signature.param_types)}")
+        literals = ", ".join(java_literal(value, java_type) for (_, value), java_type in zip(args, signature.param_types))
+        call = f"new Solution().{signature.method}({literals})"
+        if signature.return_type == "void":
+            branches.append(f"            case {index}: {call}; result = null; break;")
+        else:
+            branches.append(f"            case {index}: result = {call}; break;")
+
+    return f"""{user_code}
+
+public class Main {{
+{_JAVA_SERIALIZER}
+    public static void main(String[] args) throws Exception {{
+        java.io.BufferedReader in = new java.io.BufferedReader(new java.io.InputStreamReader(System.in));
+        int testCase = Integer.parseInt(in.readLine().trim());
+        Object result;
+        switch (testCase) {{
+{chr(10).join(branches)}
+            default: throw new IllegalArgumentException("Unknown test case " + testCase);
+        }}
+        System.out.flush();
+        System.out.println("\\n{RESULT_MARKER}" + ser(result));
+    }}
+}}
+"""
+
+
+# --- Judging -----------------------------------------------------------------
+
+def _extract_result(stdout: str) -> Tuple[bool, Any]:
+    # The solution's own output may not end in a newline, so the marker can
+    # follow it on the same line
+    for line in reversed(stdout.splitlines()):
+        if RESULT_MARKER in line:
+            payload = line[line.rindex(RESULT_MARKER) + len(RESULT_MARKER):]
+            try:
+                return True, json.loads(payload)
+            except ValueError:
+                return True, payload
+    return False, None
+
+
+def _verdict(index: int, response: Dict[str, Any], expected: Any, time_limit_ms: int, memory_limit_mb: int) -> TestVerdict:
+    run = response.get("run", {})
+    compiled = response.get("compile") or {}
+    cpu_time, memory = run.get("cpu_time"), run.get("memory")
+    stderr = run.get("stderr", "")
+
+    def verdict(status: str, actual: Any = None, message: str = "") -> TestVerdict:
+        return TestVerdict(index, status, cpu_time, memory, expected, actual, message)
+
+    if compiled.get("code") not in (None, 0):
+        return verdict(COMPILE_ERROR, message=compiled.get("stderr", "") or compiled.get("output", ""))
+    if run.get("status") == "TO" or (cpu_time is not None and cpu_time > time_limit_ms):
+        return verdict(TIME_LIMIT)
+    if "MemoryError" in stderr or "OutOfMemoryError" in stderr or (memory is not None and memory > memory_limit_mb * 1024 * 1024):
+        return verdict(MEMORY_LIMIT)
+    if run.get("status") == "OL":
+        return verdict(OUTPUT_LIMIT)
+
+    found, actual = _extract_result(run.get("stdout", ""))
+    if run.get("code") not in (0, None) or run.get("signal") or not found:
+        return verdict(RUNTIME_ERROR, message=stderr.strip()[-2000:])
+    if not values_match(expected, actual):
+        return verdict(WRONG_ANSWER, actual=actual)
+    return verdict(ACCEPTED, actual=actual)
+
+
+def judge_submission(
+    backend: ExecutionBackend,
+    problem: Dict[str, Any],
+    language: str,
+    code: str,
+    concurrency: int = 4,
+    stop_on_first_failure: bool = False,
+    time_limit_ms: int = 2000,
+    memory_limit_mb: int = 256
+) -> Dict[str, Any]:
+    """
+    Runs `code` against every test case of `problem` in parallel and returns
+    the overall verdict (the first failing test, in order), with the measured
+    worst-case CPU time and peak memory across tests.
+    """
+    language = language.lower()
+    starter = problem.get("starter_code", {}).get(language)
+    if not starter:
+        raise JudgeError(f"Language '{language}' not supported for submission yet.")
+
+    test_cases = problem.get("test_cases", [])
+    cases = [parse_arguments(case["input"]) for case in test_cases]
+    expected = [parse_expected(case["expected"]) for case in test_cases]
+
+    if language == "python":
+        source = build_python_harness(code, python_method_name(starter), cases)
+    elif language == "java":
+        source = build_java_harness(code, java_signature(starter), cases)
+    else:
+        raise JudgeError(f"Language '{language}' not supported for submission yet.")
+
+    time_limit_ms = problem.get("time_limit_ms", time_limit_ms)
+    memory_limit_mb = problem.get("memory_limit_mb", memory_limit_mb)
+
+    def passed(index: int, response: Dict[str, Any]) -> bool:
+        return _verdict(index, response, expected[index], time_limit_ms, memory_limit_mb).status == ACCEPTED
+
+    responses = backend.run_many(
+        language,
+        source,
+        [str(index) for index in range(len(cases))],
+        concurrency=concurrency,
+        check=passed,
+        stop_on_failure=stop_on_first_failure,
+        # Enforced by the sandbox too, not only used to label the verdict
+        limits=RunLimits(time_limit_ms=time_limit_ms, memory_limit_mb=memory_limit_mb)
+    )
+
+    verdicts = [
+        _verdict(index, response, expected[index], time_limit_ms, memory_limit_mb)
+        for index, response in enumerate(responses) if response is not None
+    ]
+    failed = next((v for v in verdicts if v.status != ACCEPTED), None)
+    cpu_times = [v.cpu_time for v in verdicts if v.cpu_time is not None]
+    memories = [v.memory for v in verdicts if v.memory is not None]
+
+    result = {
+        "status": failed.status if failed else ACCEPTED,
+        "passed_tests": sum(1 for v in verdicts if v.status == ACCEPTED),
+        "total_tests": len(cases),
+        "runtime": f"{max(cpu_times)}ms" if cpu_times else "N/A",
+        "memory": f"{max(memories) / (1024 * 1024):.1f}MB" if memories else "N/A",
+        "tests": [
+            {"test": v.index + 1, "status": v.status, "cpu_time_ms": v.cpu_time, "memory_bytes": v.memory}
+            for v in verdicts
+        ]
+    }
+    if failed:
+        message = f"{failed.status} on test {failed.index + 1}"
+        if failed.status == WRONG_ANSWER:
+            message += f": expected {json.dumps(failed.expected)}, got {json.dumps(failed.actual)}"
+        elif failed.message:
+            message += f": {failed.message}"
+        result["message"] = message
+    return result
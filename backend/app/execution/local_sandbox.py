@@ -0,0 +1,465 @@
+import atexit
+import hashlib
+import math
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.core.singleflight import SingleFlight
+from app.execution.base import ExecutionBackend, ExecutionUnavailable, RunLimits, UnsupportedLanguage, run_result
+from app.execution.python_pool import PythonWorkerPool, WorkerBroken
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the local sandbox is POSIX-only
+    resource = None
+
+
+class SandboxLimits(NamedTuple):
+    wall_seconds: float = 5.0
+    cpu_seconds: int = 3
+    memory_mb: int = 256
+    max_processes: int = 64
+    max_output_kb: int = 64
+    compile_seconds: float = 15.0
+    build_cache_entries: int = 256
+    python_pool_size: int = 0        # 0 = start a fresh interpreter per Python run
+    python_pool_max_runs: int = 100
+
+
+class LanguageSpec(NamedTuple):
+    filename: str
+    run: List[str]                  # "{memory_mb}" / "{classpath}" are filled in per run
+    version: List[str]
+    compile: Optional[List[str]] = None
+    # The JVM and V8 reserve far more address space than they use, so they are
+    # capped with heap flags instead of RLIMIT_AS. They also need threads, which
+    # RLIMIT_NPROC (counted per user) would starve.
+    limit_address_space: bool = True
+    limit_processes: bool = True
+
+
+LANGUAGES = {
+    "python": LanguageSpec(
+        filename="main.py",
+        run=[sys.executable, "-I", "main.py"],
+        version=[sys.executable, "--version"],
+    ),
+    "javascript": LanguageSpec(
+        filename="main.js",
+        run=["node", "--max-old-space-size={memory_mb}", "main.js"],
+        version=["node", "--version"],
+        limit_address_space=False,
+        limit_processes=False,
+    ),
+    "java": LanguageSpec(
+        filename="Main.java",
+        compile=["javac", "-encoding", "UTF-8", "-d", ".", "Main.java"],
+        run=["java", "-Xmx{memory_mb}m", "-XX:+UseSerialGC", "-XX:TieredStopAtLevel=1", "-cp", "{classpath}", "Main"],
+        version=["java", "-version"],
+        limit_address_space=False,
+        limit_processes=False,
+    ),
+}
+
+# Sets the rlimits packed in argv[1] ("RLIMIT_X:soft:hard,...") and execs argv[2:]
+_LAUNCHER = (
+    "import os, resource, sys\n"
+    "for item in sys.argv[1].split(','):\n"
+    "    name, soft, hard = item.split(':')\n"
+    "    resource.setrlimit(getattr(resource, name), (int(soft), int(hard)))\n"
+    "os.execvp(sys.argv[2], sys.argv[2:])\n"
+)
+
+# Piston-style status codes for abnormal runs
+STATUS_MESSAGES = {
+    "TO": "Time limit exceeded",
+    "OL": "Output limit exceeded",
+    "SG": "Killed by signal",
+    "RE": "Runtime error",
+}
+
+
+class LocalSandboxBackend(ExecutionBackend):
+    """
+    Runs code in a subprocess on this host: a fresh temp workdir per run, a
+    minimal environment, rlimits for CPU time, memory, processes and file size
+    (which also caps output, since stdout/stderr go to files), and a wall-clock
+    timeout that kills the whole process group.
+
+    Compiled languages are built once per distinct source: the class files
+    are kept in a build cache keyed by the source hash (LRU, bounded by
+    `build_cache_entries`) and copied into each run's workdir, so every test
+    case of a submission, and every re-run of unchanged code, skips javac.
+    Concurrent builds of the same source are coalesced.
+
+    With `python_pool_size` > 0, Python runs go to a PythonWorkerPool of warm
+    interpreters that fork a child per run under the same limits.
+
+    This is resource isolation, not a security boundary; deploy it inside a
+    container or VM when running untrusted code.
+    """
+    name = "local"
+
+    def __init__(self, limits: SandboxLimits, workdir_root: Optional[str] = None, max_workers: int = 8):
+        if resource is None or os.name != "posix":
+            raise RuntimeError("EXECUTION_BACKEND=local requires a POSIX host (Linux/macOS)")
+        super().__init__(max_workers)
+        self.limits = limits
+        self.workdir_root = workdir_root or None
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.timeouts = 0
+        self.errors = 0
+        # source digest -> (compile result, build dir or None if compilation failed)
+        self._builds: "OrderedDict[str, Tuple[Dict[str, Any], Optional[str]]]" = OrderedDict()
+        self._build_lock = threading.Lock()
+        self._build_flight = SingleFlight()
+        self.builds = 0
+        self.build_hits = 0
+        atexit.register(self.clear_build_cache)
+
+        self.python_pool = None
+        if limits.python_pool_size > 0:
+            self.python_pool = PythonWorkerPool(limits.python_pool_size, limits.python_pool_max_runs, self._env(tempfile.gettempdir()))
+            atexit.register(self.python_pool.close)
+
+    def warm_up(self) -> None:
+        if self.python_pool is not None:
+            self.python_pool.start()
+
+    def _spec(self, language: str) -> LanguageSpec:
+        spec = LANGUAGES.get(language.lower())
+        if spec is None:
+            raise UnsupportedLanguage(f"Language '{language}' is not supported by the local sandbox")
+        return spec
+
+    def _command(self, template: List[str], classpath: str = ".", limits: Optional[SandboxLimits] = None) -> List[str]:
+        memory_mb = (limits or self.limits).memory_mb
+        return [part.format(memory_mb=memory_mb, classpath=classpath) for part in template]
+
+    def _run_limits(self, overrides: Optional[RunLimits]) -> SandboxLimits:
+        """
+        The sandbox limits with per-run overrides applied. RLIMIT_CPU takes
+        whole seconds, so a time limit is rounded up (callers compare the
+        measured cpu_time for exact verdicts); the wall-clock timeout keeps
+        its default ratio to the CPU limit.
+        """
+        limits = self.limits
+        if overrides is None:
+            return limits
+        if overrides.time_limit_ms:
+            cpu_seconds = max(1, math.ceil(overrides.time_limit_ms / 1000))
+            wall_seconds = limits.wall_seconds * cpu_seconds / max(1, limits.cpu_seconds)
+            limits = limits._replace(cpu_seconds=cpu_seconds, wall_seconds=wall_seconds)
+        if overrides.memory_limit_mb:
+            limits = limits._replace(memory_mb=overrides.memory_limit_mb)
+        return limits
+
+    def runtime_version(self, language: str) -> str:
+        language = language.lower()
+        if language not in self._versions:
+            spec = self._spec(language)
+            try:
+                proc = subprocess.run(spec.version, capture_output=True, text=True, timeout=10)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                raise ExecutionUnavailable(f"{spec.version[0]} is not available on the execution host ({e})")
+            match = re.search(r"\d+(\.\d+)*", proc.stdout + proc.stderr)
+            self._versions[language] = match.group(0) if match else "unknown"
+        return self._versions[language]
+
+    def _env(self, workdir: str) -> Dict[str, str]:
+        return {
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+            "HOME": workdir,
+            "TMPDIR": workdir,
+            "LANG": "C.UTF-8",
+            "PYTHONIOENCODING": "utf-8",
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+
+    def _rlimits(self, spec: LanguageSpec, cpu_seconds: int, limit_memory: bool, limits: Optional[SandboxLimits] = None) -> Dict[str, Tuple[int, int]]:
+        limits = limits or self.limits
+        output_bytes = limits.max_output_kb * 1024
+        rlimits = {
+            "RLIMIT_CPU": (cpu_seconds, cpu_seconds + 1),
+            "RLIMIT_CORE": (0, 0),
+            "RLIMIT_FSIZE": (output_bytes, output_bytes),
+        }
+        if limit_memory and spec.limit_address_space:
+            memory_bytes = limits.memory_mb * 1024 * 1024
+            rlimits["RLIMIT_AS"] = (memory_bytes, memory_bytes)
+        if spec.limit_processes and limits.max_processes:
+            rlimits["RLIMIT_NPROC"] = (limits.max_processes, limits.max_processes)
+        return rlimits
+
+    def _launcher(self, spec: LanguageSpec, cpu_seconds: int, limit_memory: bool, limits: Optional[SandboxLimits] = None) -> List[str]:
+        """
+        Command prefix that applies the rlimits and execs the real command.
+        Runs are started from pool threads, where preexec_fn is unsafe.
+        """
+        rlimits = self._rlimits(spec, cpu_seconds, limit_memory, limits)
+        packed = ",".join(f"{name}:{soft}:{hard}" for name, (soft, hard) in rlimits.items())
+        return [sys.executable, "-I", "-S", "-c", _LAUNCHER, packed]
+
+    def _read_capped(self, path: str) -> str:
+        with open(path, "rb") as f:
+            return f.read(self.limits.max_output_kb * 1024).decode("utf-8", errors="replace")
+
+    def _execute(
+        self,
+        spec: LanguageSpec,
+        command: List[str],
+        workdir: str,
+        stdin: str,
+        wall_seconds: float,
+        cpu_seconds: int,
+        limit_memory: bool = True,
+        limits: Optional[SandboxLimits] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs `command` in `workdir` and returns a Piston-shaped stage result
+        with measured cpu_time / wall_time (ms) and peak memory (bytes).
+        """
+        stdin_path = os.path.join(workdir, ".stdin")
+        stdout_path = os.path.join(workdir, ".stdout")
+        stderr_path = os.path.join(workdir, ".stderr")
+        with open(stdin_path, "w", encoding="utf-8") as f:
+            f.write(stdin or "")
+
+        timed_out = threading.Event()
+        with open(stdin_path, "rb") as fin, open(stdout_path, "wb") as fout, open(stderr_path, "wb") as ferr:
+            env = self._env(workdir)
+            if shutil.which(command[0], path=env["PATH"]) is None:
+                raise ExecutionUnavailable(f"{command[0]} is not installed on the execution host")
+            start = time.monotonic()
+            proc = subprocess.Popen(
+                self._launcher(spec, cpu_seconds, limit_memory, limits) + command,
+                cwd=workdir,
+                stdin=fin,
+                stdout=fout,
+                stderr=ferr,
+                env=env,
+                start_new_session=True,
+                close_fds=True
+            )
+
+            def kill_group():
+                timed_out.set()
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+
+            timer = threading.Timer(wall_seconds, kill_group)
+            timer.start()
+            try:
+                # wait4 (instead of proc.wait) also gives us the child's rusage
+                _, status, usage = os.wait4(proc.pid, 0)
+            finally:
+                timer.cancel()
+            wall_time = time.monotonic() - start
+            proc.returncode = os.waitstatus_to_exitcode(status)
+
+        # Reap anything the program left running in the background
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+        return self._stage_result(
+            proc.returncode,
+            timed_out.is_set(),
+            cpu_seconds=usage.ru_utime + usage.ru_stime,
+            wall_seconds=wall_time,
+            maxrss=usage.ru_maxrss,
+            workdir=workdir
+        )
+
+    def _stage_result(self, returncode: int, timed_out: bool, cpu_seconds: float, wall_seconds: float, maxrss: int, workdir: str) -> Dict[str, Any]:
+        """
+        Piston-shaped stage result with measured cpu_time / wall_time (ms) and
+        peak memory (bytes), from a finished process's exit code and rusage.
+        """
+        stdout_path = os.path.join(workdir, ".stdout")
+        stderr_path = os.path.join(workdir, ".stderr")
+
+        code, sig, status_code = returncode, None, None
+        if code < 0:
+            sig = signal.Signals(-code).name
+            code = None
+            if timed_out or sig == "SIGXCPU":
+                status_code = "TO"
+            elif sig == "SIGXFSZ":
+                status_code = "OL"
+            else:
+                status_code = "SG"
+        elif code != 0:
+            status_code = "RE"
+        # Python ignores SIGXFSZ and fails the write instead; check the files too.
+        # A timeout wins: a program killed by the wall timer may have been writing
+        output_cap = self.limits.max_output_kb * 1024
+        if status_code != "TO" and code != 0 and max(os.path.getsize(stdout_path), os.path.getsize(stderr_path)) >= output_cap:
+            status_code = "OL"
+
+        stderr = self._read_capped(stderr_path)
+        if status_code in ("TO", "OL"):
+            stderr += f"\n{STATUS_MESSAGES[status_code]}"
+        return run_result(
+            stdout=self._read_capped(stdout_path),
+            stderr=stderr,
+            code=code,
+            signal=sig,
+            status=status_code,
+            message=STATUS_MESSAGES.get(status_code),
+            cpu_time=int(cpu_seconds * 1000),
+            wall_time=int(wall_seconds * 1000),
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            memory=maxrss if sys.platform == "darwin" else maxrss * 1024
+        )
+
+    def _execute_pooled(self, spec: LanguageSpec, workdir: str, stdin: str, limits: SandboxLimits) -> Dict[str, Any]:
+        with open(os.path.join(workdir, ".stdin"), "w", encoding="utf-8") as f:
+            f.write(stdin or "")
+        job = {"workdir": workdir, "rlimits": self._rlimits(spec, limits.cpu_seconds, limit_memory=True, limits=limits)}
+        pooled = self.python_pool.run(job, limits.wall_seconds)
+        return self._stage_result(
+            os.waitstatus_to_exitcode(pooled.status),
+            pooled.timed_out,
+            cpu_seconds=pooled.cpu_seconds,
+            wall_seconds=pooled.wall_seconds,
+            maxrss=pooled.maxrss_kb,
+            workdir=workdir
+        )
+
+    def _compile(self, spec: LanguageSpec, workdir: str) -> Dict[str, Any]:
+        limits = self.limits
+        return self._execute(
+            spec, self._command(spec.compile), workdir, "",
+            wall_seconds=limits.compile_seconds,
+            cpu_seconds=int(limits.compile_seconds) + 1,
+            limit_memory=False
+        )
+
+    def _compile_to_cache(self, spec: LanguageSpec, code: str, digest: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        build_dir = tempfile.mkdtemp(prefix="sandbox-build-", dir=self.workdir_root)
+        with open(os.path.join(build_dir, spec.filename), "w", encoding="utf-8") as f:
+            f.write(code)
+        compiled = self._compile(spec, build_dir)
+        if compiled["code"] != 0:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            build_dir = None
+
+        entry = (compiled, build_dir)
+        if compiled["code"] is None or compiled.get("signal") or compiled.get("status") == "TO":
+            # Killed or timed out (e.g. a slow javac under load): not a verdict
+            # on the source, so the next run compiles again
+            return entry
+        with self._build_lock:
+            self.builds += 1
+            self._builds[digest] = entry
+            while len(self._builds) > self.limits.build_cache_entries:
+                _, (_, old_dir) = self._builds.popitem(last=False)
+                if old_dir:
+                    shutil.rmtree(old_dir, ignore_errors=True)
+        return entry
+
+    def _build_into(self, spec: LanguageSpec, code: str, workdir: str) -> Dict[str, Any]:
+        """
+        Puts the compiled artifacts for `code` into `workdir`, compiling only
+        if this source is not in the build cache. Returns the compile result.
+        """
+        digest = hashlib.sha256(f"{spec.filename}\0{code}".encode("utf-8")).hexdigest()
+        for _ in range(2):
+            with self._build_lock:
+                entry = self._builds.get(digest)
+                if entry is not None:
+                    self._builds.move_to_end(digest)
+                    self.build_hits += 1
+            if entry is None:
+                entry = self._build_flight.do(digest, lambda: self._compile_to_cache(spec, code, digest))
+
+            compiled, build_dir = entry
+            if build_dir is None:
+                return compiled
+            # Copy under the lock so the entry cannot be evicted mid-copy
+            with self._build_lock:
+                if os.path.isdir(build_dir):
+                    for name in os.listdir(build_dir):
+                        if name.endswith(".class"):
+                            shutil.copy2(os.path.join(build_dir, name), workdir)
+                    return compiled
+        # Evicted twice in a row under heavy churn: compile in place
+        return self._compile(spec, workdir)
+
+    def clear_build_cache(self) -> None:
+        with self._build_lock:
+            for _, build_dir in self._builds.values():
+                if build_dir:
+                    shutil.rmtree(build_dir, ignore_errors=True)
+            self._builds.clear()
+
+    def run(self, language: str, code: str, stdin: str = "", limits: Optional[RunLimits] = None) -> Dict[str, Any]:
+        spec = self._spec(language)
+        run_limits = self._run_limits(limits)
+        with self._lock:
+            self.runs += 1
+
+        with tempfile.TemporaryDirectory(prefix="sandbox-", dir=self.workdir_root) as workdir:
+            with open(os.path.join(workdir, spec.filename), "w", encoding="utf-8") as f:
+                f.write(code)
+
+            response: Dict[str, Any] = {"language": language.lower(), "version": self.runtime_version(language)}
+            if spec.compile:
+                compiled = self._build_into(spec, code, workdir)
+                response["compile"] = compiled
+                if compiled["code"] != 0:
+                    # Surface compiler errors through the run stage, like a failed run
+                    response["run"] = run_result(stderr=compiled["stderr"], code=compiled["code"] or 1, signal=compiled["signal"], status="CE", message="Compilation error")
+                    with self._lock:
+                        self.errors += 1
+                    return response
+
+            result = None
+            if self.python_pool is not None and spec is LANGUAGES["python"]:
+                try:
+                    result = self._execute_pooled(spec, workdir, stdin, run_limits)
+                except WorkerBroken as e:
+                    print(f"LocalSandbox: Python worker failed ({e}), running in a fresh interpreter.")
+            if result is None:
+                result = self._execute(
+                    spec, self._command(spec.run, limits=run_limits), workdir, stdin,
+                    wall_seconds=run_limits.wall_seconds,
+                    cpu_seconds=run_limits.cpu_seconds,
+                    limits=run_limits
+                )
+            response["run"] = result
+
+        with self._lock:
+            if result["status"] == "TO":
+                self.timeouts += 1
+            elif result["status"]:
+                self.errors += 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "runs": self.runs,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "builds": self.builds,
+            "build_cache_hits": self.build_hits,
+            "build_cache_size": len(self._builds),
+            "build_single_flight": self._build_flight.stats(),
+            "python_pool": self.python_pool.stats() if self.python_pool else None,
+            "limits": self.limits._asdict(),
+        }
@@ -0,0 +1,151 @@
+import random
+import time
+from typing import Any, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpen
+from app.core.metrics import LatencyWindow
+from app.execution.base import ExecutionBackend, ExecutionUnavailable, RunLimits
+
+# Map our language names to Piston's runtime names
+RUNTIME_MAP = {
+    "python": {"language": "python", "version": "3.10.0"},
+    "java": {"language": "java", "version": "15.0.2"},
+    "javascript": {"language": "javascript", "version": "18.15.0"}
+}
+
+# Upstream answers worth another attempt (rate limited / gateway trouble)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response: requests.Response):
+        super().__init__(f"Piston returned HTTP {response.status_code}")
+        self.response = response
+
+
+class PistonBackend(ExecutionBackend):
+    """
+    Proxies runs to a Piston API (https://emkc.org/api/v2/piston by default).
+
+    All calls share one keep-alive Session whose connection pool matches the
+    worker count, with strict connect/read timeouts. Connection failures and
+    429/5xx gateway answers are retried with jittered exponential backoff
+    (a run has no side effects, so it is safe to repeat); after
+    `failure_threshold` consecutive failed calls the circuit opens and runs
+    fail fast with ExecutionUnavailable until `reset_timeout` has passed.
+    """
+    name = "piston"
+
+    def __init__(
+        self,
+        url: str,
+        max_workers: int = 8,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 20.0,
+        retries: int = 2,
+        backoff_seconds: float = 0.2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        super().__init__(max_workers)
+        self.url = url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyWindow()
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _runtime(self, language: str) -> Dict[str, str]:
+        # Piston supports many, let's try direct map if not in our rigorous list
+        return RUNTIME_MAP.get(language.lower(), {"language": language.lower(), "version": "*"})
+
+    def runtime_version(self, language: str) -> str:
+        return self._runtime(language)["version"]
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), 5.0)
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in range(self.retries + 1):
+            start = time.monotonic()
+            self.requests += 1
+            try:
+                response = self.session.post(f"{self.url}/execute", json=payload, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES:
+                    raise _RetryableStatus(response)
+                response.raise_for_status()
+                return response.json()
+            except (requests.exceptions.ConnectionError, _RetryableStatus) as e:
+                # ConnectTimeout is a ConnectionError; ReadTimeout is not and is
+                # not retried (the run may have taken the whole budget already)
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                delay = self._backoff(attempt, getattr(e, "response", None))
+                print(f"Piston API Error: {e}, retrying in {delay:.2f}s ({attempt + 1}/{self.retries})")
+                time.sleep(delay)
+            finally:
+                self.latency.record(time.monotonic() - start)
+
+    def run(self, language: str, code: str, stdin: str = "", limits: Optional[RunLimits] = None) -> Dict[str, Any]:
+        runtime = self._runtime(language)
+
+        # Prepare file object with name if needed
+        file_obj = {"content": code}
+        if runtime["language"] == "java":
+            file_obj["name"] = "Main.java"
+
+        payload = {
+            "language": runtime["language"],
+            "version": runtime["version"],
+            "files": [file_obj],
+            "stdin": stdin
+        }
+        if limits and limits.time_limit_ms:
+            payload["run_timeout"] = limits.time_limit_ms
+        if limits and limits.memory_limit_mb:
+            payload["run_memory_limit"] = limits.memory_limit_mb * 1024 * 1024
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpen:
+            raise ExecutionUnavailable("Code execution service unavailable")
+
+        try:
+            result = self._post(payload)
+        except (requests.exceptions.RequestException, _RetryableStatus, ValueError) as e:
+            print(f"Piston API Error: {e}")
+            self.failed += 1
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is not None and 400 <= status < 500 and status != 429:
+                # Our request was rejected; the upstream itself is fine
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise ExecutionUnavailable("Code execution service unavailable")
+
+        self.breaker.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "url": self.url,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+            "circuit": self.breaker.stats(),
+            "latency": self.latency.percentiles(),
+        }
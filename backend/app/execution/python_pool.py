@@ -0,0 +1,182 @@
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_worker.py")
+
+
+class PooledRun(NamedTuple):
+    status: int          # raw wait status of the job process
+    cpu_seconds: float
+    maxrss_kb: int
+    wall_seconds: float
+    timed_out: bool
+
+
+class WorkerBroken(Exception):
+    pass
+
+
+class _Worker:
+    def __init__(self, env: Dict[str, str]):
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env,
+            start_new_session=True
+        )
+        self.runs = 0
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read(self) -> dict:
+        line = self.proc.stdout.readline()
+        if not line:
+            raise WorkerBroken("Python worker exited unexpectedly")
+        return json.loads(line)
+
+    def run(self, job: Dict[str, Any], wall_seconds: float) -> PooledRun:
+        self.runs += 1
+        try:
+            self.proc.stdin.write(json.dumps(job) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerBroken(str(e))
+
+        start = time.monotonic()
+        pid = self._read()["pid"]
+        timed_out = threading.Event()
+
+        def kill_job():
+            timed_out.set()
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+        timer = threading.Timer(wall_seconds, kill_job)
+        timer.start()
+        try:
+            reply = self._read()
+        finally:
+            timer.cancel()
+        wall = time.monotonic() - start
+
+        # Reap anything the program left running in the background
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        return PooledRun(reply["status"], reply["cpu"], reply["maxrss"], wall, timed_out.is_set())
+
+    def close(self) -> None:
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.proc.wait()
+
+
+class PythonWorkerPool:
+    """
+    Pre-started Python interpreters that fork a fresh, rlimited child per job,
+    so a run costs a fork instead of interpreter startup and imports.
+
+    A worker is recycled (killed and replaced in the background) after
+    `max_runs` jobs or after any job that hit the wall-clock timeout.
+    At most `size` jobs run at once; further callers wait for a free worker.
+    """
+    def __init__(self, size: int, max_runs: int, env: Dict[str, str]):
+        self.size = size
+        self.max_runs = max_runs
+        self.env = env
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.runs = 0
+        self.spawned = 0
+        self.recycled = 0
+
+    def _spawn(self) -> _Worker:
+        try:
+            worker = _Worker(self.env)
+        except OSError as e:
+            raise WorkerBroken(f"Failed to start Python worker: {e}")
+        self.spawned += 1
+        return worker
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(self.size):
+                try:
+                    self._idle.put(self._spawn())
+                except WorkerBroken as e:
+                    # Keep the slot; the worker is started on demand
+                    print(f"PythonWorkerPool: {e}, will retry on demand.")
+                    self._idle.put(None)
+
+    def _replace_in_background(self) -> None:
+        def spawn():
+            try:
+                self._idle.put(self._spawn())
+            except Exception as e:
+                print(f"PythonWorkerPool: Failed to start worker ({e}), will retry on demand.")
+                self._idle.put(None)
+        threading.Thread(target=spawn, daemon=True).start()
+
+    def run(self, job: Dict[str, Any], wall_seconds: float) -> PooledRun:
+        self.start()
+        worker = self._idle.get()
+        recycle = True
+        try:
+            if worker is None or not worker.alive():
+                if worker is not None:
+                    worker.close()
+                worker = None
+                worker = self._spawn()
+            result = worker.run(job, wall_seconds)
+            recycle = result.timed_out or worker.runs >= self.max_runs
+            return result
+        finally:
+            self.runs += 1
+            if worker is None:
+                # Spawning failed: give the slot back, the next run retries
+                self._idle.put(None)
+            elif recycle:
+                self.recycled += 1
+                worker.close()
+                self._replace_in_background()
+            else:
+                self._idle.put(worker)
+
+    def close(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "max_runs": self.max_runs,
+            "idle": self._idle.qsize(),
+            "runs": self.runs,
+            "spawned": self.spawned,
+            "recycled": self.recycled,
+        }
@@ -0,0 +1,107 @@
+"""
+Warm Python worker for the local sandbox, started by PythonWorkerPool.
+
+Reads one JSON job per line on stdin, forks a child per job and replies with
+two JSON lines on stdout: {"pid": ...} once the child exists (so the pool can
+enforce the wall-clock timeout on it) and {"status": ..., "cpu": ..., "maxrss": ...}
+when it has exited. The child applies the job's rlimits, moves into the job's
+workdir and runs main.py there with .stdin/.stdout/.stderr as its std streams.
+
+Standalone on purpose (stdlib only): it is executed as a script, outside the app.
+"""
+import gc
+import json
+import os
+import resource
+import sys
+import traceback
+import types
+
+# Preloaded so user programs do not pay for the common imports
+import bisect  # noqa: F401
+import collections  # noqa: F401
+import functools  # noqa: F401
+import heapq  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import re  # noqa: F401
+import string  # noqa: F401
+
+
+def _run_job(job):
+    os.setsid()
+    for name, (soft, hard) in job["rlimits"].items():
+        resource.setrlimit(getattr(resource, name), (soft, hard))
+
+    workdir = job["workdir"]
+    os.chdir(workdir)
+    os.environ["HOME"] = workdir
+    os.environ["TMPDIR"] = workdir
+    streams = (
+        (0, ".stdin", os.O_RDONLY),
+        (1, ".stdout", os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+        (2, ".stderr", os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+    )
+    for fd, name, flags in streams:
+        opened = os.open(name, flags, 0o600)
+        os.dup2(opened, fd)
+        os.close(opened)
+    # Drop the pipes to the pool and anything else inherited from the worker
+    os.closerange(3, 1024)
+
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+    sys.argv = ["main.py"]
+    sys.path[0:0] = [workdir]
+
+    code = 0
+    try:
+        # Same as `python main.py`, minus runpy's import overhead
+        with open("main.py", "rb") as f:
+            program = compile(f.read(), "main.py", "exec")
+        module = types.ModuleType("__main__")
+        module.__file__ = "main.py"
+        sys.modules["__main__"] = module
+        exec(program, module.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                code = code or 1
+    os._exit(code & 0xFF)
+
+
+def main():
+    # Keep the warm heap out of the collector so forked children don't copy it
+    gc.freeze()
+    out = sys.stdout
+    for line in sys.stdin:
+        job = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_job(job)
+            finally:
+                os._exit(70)
+        out.write(json.dumps({"pid": pid}) + "\n")
+        out.flush()
+        _, status, usage = os.wait4(pid, 0)
+        out.write(json.dumps({"status": status, "cpu": usage.ru_utime + usage.ru_stime, "maxrss": usage.ru_maxrss}) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
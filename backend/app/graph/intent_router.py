@@ -0,0 +1,214 @@
+import json
+import math
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+from app.core.config import settings
+from app.core import metrics
+
+INTENTS = ["chat", "skill", "content", "interview"]
+
+# Keyword rules: cheap regex checks that settle the obvious messages.
+RULES: Dict[str, List[str]] = {
+    "interview": [
+        r"\bmock interview\b",
+        r"\b(start|begin|take|do|practice)\b.*\binterview\b",
+        r"\binterview (me|practice|prep)\b",
+    ],
+    "skill": [
+        r"\b(learning|study) (path|plan|roadmap)\b",
+        r"\bsyllabus\b",
+        r"\broadmap\b",
+        r"\b(create|generate|make|build) (a |my )?(python |java )?(path|curriculum|course plan)\b",
+        r"\b(identify|assess|what are) my (skills|weak)",
+    ],
+    "content": [
+        r"\b(generate|create|give me|write) (a |me a )?(lesson|tutorial)\b",
+        r"\bteach me\b",
+        r"\bexplain\b.*\b(in depth|in detail|indepth|thoroughly)\b",
+        r"\blesson (on|about)\b",
+    ],
+    "chat": [
+        r"^(hi|hello|hey|thanks|thank you|ok|okay|bye)\b[\s!.?]*$",
+        r"\b(error|exception|traceback|bug|doesn'?t work|not working)\b",
+        r"\bwhy (does|is|do)\b",
+    ],
+}
+
+# Seed utterances per intent; their mean embedding is the class centroid.
+EXAMPLES: Dict[str, List[str]] = {
+    "chat": [
+        "Hello, how are you?",
+        "Why does my for loop print the same value twice?",
+        "What is the difference between a list and a tuple?",
+        "Can you help me fix this NullPointerException?",
+        "How do I reverse a string in Java?",
+        "Thanks, that helped!",
+        "Is Python pass by reference?",
+        "What does this error mean?",
+    ],
+    "skill": [
+        "Create a Python learning path for me",
+        "Generate a syllabus for Java",
+        "What should I study next?",
+        "Build me a roadmap to learn data structures",
+        "Which topics am I weak at?",
+        "Plan my course based on my quiz results",
+    ],
+    "content": [
+        "Explain recursion in depth",
+        "Give me a lesson on object oriented programming",
+        "Teach me how inheritance works in Java",
+        "I want a detailed tutorial on Python decorators",
+        "Write a lesson about exception handling",
+        "Explain how hash maps work with examples",
+    ],
+    "interview": [
+        "Start a mock interview",
+        "Interview me on Python",
+        "I want to practice a technical interview",
+        "Can we do a coding interview for Java?",
+        "Let's begin the interview",
+        "Prepare me for a job interview with questions",
+    ],
+}
+
+_COMPILED = {intent: [re.compile(p, re.IGNORECASE) for p in patterns] for intent, patterns in RULES.items()}
+
+
+class IntentDecision(NamedTuple):
+    intent: str
+    confidence: float
+    source: str  # "rule", "embedding" or "none"
+    scores: Dict[str, float]
+    latency_ms: float
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class IntentRouter:
+    """
+    Local intent classifier for free-form chat messages.
+    Tier 1 is a keyword rule table; tier 2 is nearest-centroid matching on the
+    MiniLM sentence embeddings already loaded by the RAG system. The supervisor
+    only falls back to the LLM when confidence is below the threshold.
+    """
+    def __init__(self, threshold: float = 0.6, log_path: str = "", temperature: float = 0.05):
+        self.threshold = threshold
+        self.log_path = log_path
+        self.temperature = temperature
+        self._centroids: Optional[Dict[str, List[float]]] = None
+        self._embed = None
+        self._embedding_unavailable = False
+        self._lock = threading.Lock()
+        self.counts = {"rule": 0, "embedding": 0, "llm": 0}
+
+    def _classify_rules(self, text: str) -> Optional[str]:
+        matched = [intent for intent, patterns in _COMPILED.items() if any(p.search(text) for p in patterns)]
+        # Conflicting rules are left to the embedding tier
+        return matched[0] if len(matched) == 1 else None
+
+    def _load_centroids(self) -> bool:
+        if self._centroids is not None:
+            return True
+        if self._embedding_unavailable:
+            return False
+        with self._lock:
+            if self._centroids is not None:
+                return True
+            try:
+                from app.core.rag import get_rag_system
+                rag_system = get_rag_system(wait=False)
+                if rag_system is None:
+                    # Rules + LLM only until the model has loaded; retried next call
+                    return False
+                embed = rag_system.embedding_fn
+                centroids = {}
+                for intent, examples in EXAMPLES.items():
+                    vectors = [list(v) for v in embed(examples)]
+                    dim = len(vectors[0])
+                    centroids[intent] = [sum(v[i] for v in vectors) / len(vectors) for i in range(dim)]
+                self._embed = embed
+                self._centroids = centroids
+                print(f"IntentRouter: Built {len(centroids)} intent centroids.")
+            except Exception as e:
+                print(f"WARNING: IntentRouter embedding tier unavailable: {e}")
+                self._embedding_unavailable = True
+                return False
+        return True
+
+    def _classify_embedding(self, text: str) -> Optional[Dict[str, float]]:
+        if not self._load_centroids():
+            return None
+        vector = list(self._embed([text])[0])
+        return {intent: _cosine(vector, centroid) for intent, centroid in self._centroids.items()}
+
+    def classify(self, text: str) -> IntentDecision:
+        start = time.perf_counter()
+        text = text.strip()
+
+        intent = self._classify_rules(text)
+        if intent:
+            return IntentDecision(intent, 0.95, "rule", {}, (time.perf_counter() - start) * 1000)
+
+        similarities = self._classify_embedding(text)
+        if not similarities:
+            return IntentDecision("chat", 0.0, "none", {}, (time.perf_counter() - start) * 1000)
+
+        # Softmax over cosine similarities gives a calibrated-ish confidence
+        exps = {k: math.exp(v / self.temperature) for k, v in similarities.items()}
+        total = sum(exps.values())
+        probs = {k: round(v / total, 4) for k, v in exps.items()}
+        best = max(probs, key=probs.get)
+        return IntentDecision(best, probs[best], "embedding", probs, (time.perf_counter() - start) * 1000)
+
+    def is_confident(self, decision: IntentDecision) -> bool:
+        return decision.confidence >= self.threshold
+
+    def record(self, text: str, decision: IntentDecision, llm_intent: Optional[str] = None) -> None:
+        """
+        Counts the decision and appends it to the decision log (JSONL).
+        `llm_intent` is set when the LLM made the final call, which gives a
+        label for offline evaluation of the local router.
+        """
+        source = "llm" if llm_intent else decision.source
+        self.counts[source] = self.counts.get(source, 0) + 1
+        if not self.log_path:
+            return
+        entry = {
+            "ts": time.time(),
+            "message": text,
+            "router_intent": decision.intent,
+            "confidence": decision.confidence,
+            "source": decision.source,
+            "scores": decision.scores,
+            "latency_ms": round(decision.latency_ms, 3),
+            "llm_intent": llm_intent,
+            "final_intent": llm_intent or decision.intent,
+        }
+        try:
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            print(f"WARNING: Could not write intent decision log: {e}")
+
+    def stats(self) -> Dict:
+        total = sum(self.counts.values())
+        local = self.counts["rule"] + self.counts["embedding"]
+        return {
+            "threshold": self.threshold,
+            "decisions": dict(self.counts),
+            "llm_bypass_rate": round(local / total, 4) if total else 0.0,
+        }
+
+
+intent_router = IntentRouter(
+    threshold=settings.INTENT_ROUTER_THRESHOLD,
+    log_path=settings.INTENT_DECISION_LOG_PATH
+)
+metrics.register("intent_router", intent_router.stats)
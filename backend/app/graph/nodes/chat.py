@@ -1,14 +1,70 @@
 from typing import Dict, Any, List
 from app.core.state import AgentState
-from app.core.llm import llm_client
+from app.core.llm import llm_client, async_llm_client
+from app.core.rate_limit import LLMPriority
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langgraph.config import get_stream_writer
 
 def chat_node(state: AgentState) -> Dict[str, Any]:
     """
     General Chat Tutor.
     """
     print("--- CHAT NODE ---")
-    
+
+    try:
+        response_text = llm_client.chat_completion(
+            _build_llm_messages(state),
+            priority=LLMPriority.NORMAL,
+            user=state.get("user_email")
+        )
+    except Exception as e:
+        print(f"ChatNode Error: {e}")
+        response_text = "I'm having trouble thinking right now. Please try again."
+
+    return {
+        "messages": [AIMessage(content=response_text)],
+        "next_node": "end"
+    }
+
+async def achat_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async variant of chat_node used by app_graph.ainvoke.
+    """
+    print("--- CHAT NODE (async) ---")
+
+    streaming = state.get("payload", {}).get("stream")
+    try:
+        if streaming:
+            # Emit tokens on the graph's "custom" stream as they arrive (SSE chat)
+            writer = get_stream_writer()
+            parts = []
+            async for chunk in async_llm_client.astream_chat_completion(
+                _build_llm_messages(state),
+                user=state.get("user_email"),
+                priority=LLMPriority.NORMAL
+            ):
+                parts.append(chunk)
+                writer({"token": chunk})
+            response_text = "".join(parts)
+        else:
+            response_text = await async_llm_client.achat_completion(
+                _build_llm_messages(state),
+                priority=LLMPriority.NORMAL,
+                user=state.get("user_email")
+            )
+    except Exception as e:
+        print(f"ChatNode Error: {e}")
+        if streaming:
+            # The SSE endpoint reports it as an error event and does not save the turn
+            raise
+        response_text = "I'm having trouble thinking right now. Please try again."
+
+    return {
+        "messages": [AIMessage(content=response_text)],
+        "next_node": "end"
+    }
+
+def _build_llm_messages(state: AgentState) -> List[Dict[str, str]]:
     messages = state.get("messages", [])
     user_profile = state.get("user_profile", {})
     
@@ -44,13 +100,4 @@ def chat_node(state: AgentState) -> Dict[str, Any]:
         elif isinstance(msg, dict):
              llm_messages.append(msg)
 
-    try:
-        response_text = llm_client.chat_completion(llm_messages)
-    except Exception as e:
-        print(f"ChatNode Error: {e}")
-        response_text = "I'm having trouble thinking right now. Please try again."
-
-    return {
-        "messages": [AIMessage(content=response_text)],
-        "next_node": "end"
-    }
+    return llm_messages
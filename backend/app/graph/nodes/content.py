@@ -1,13 +1,59 @@
+import asyncio
 from typing import Dict, Any
 from app.core.state import AgentState
-from app.core.llm import llm_client
+from app.core.llm import llm_client, async_llm_client
+from app.core.rate_limit import LLMPriority
+
+# Lessons are keyed on topic + profile tags, which repeat heavily across a cohort.
+LESSON_CACHE_TTL = 6 * 60 * 60
 
 def content_node(state: AgentState) -> Dict[str, Any]:
     """
     Generates personalized learning content (markdown lesson).
     """
     print("--- CONTENT NODE ---")
-    
+
+    try:
+        content_raw = llm_client.generate(
+            _build_lesson_prompt(state),
+            cache_ttl=LESSON_CACHE_TTL,
+            priority=LLMPriority.HIGH,
+            user=state.get("user_email")
+        )
+        content = _clean_lesson(content_raw)
+    except Exception as e:
+        content = _lesson_error(e)
+
+    return {
+        "payload": {"content": content},
+        "next_node": "end"
+    }
+
+async def acontent_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async variant of content_node used by app_graph.ainvoke.
+    """
+    print("--- CONTENT NODE (async) ---")
+
+    try:
+        # RAG lookup is CPU/disk bound (embedding + Chroma), keep it off the loop
+        prompt = await asyncio.to_thread(_build_lesson_prompt, state)
+        content_raw = await async_llm_client.agenerate(
+            prompt,
+            cache_ttl=LESSON_CACHE_TTL,
+            priority=LLMPriority.HIGH,
+            user=state.get("user_email")
+        )
+        content = _clean_lesson(content_raw)
+    except Exception as e:
+        content = _lesson_error(e)
+
+    return {
+        "payload": {"content": content},
+        "next_node": "end"
+    }
+
+def _build_lesson_prompt(state: AgentState) -> str:
     payload = state.get("payload", {})
     user_profile = state.get("user_profile", {})
     
@@ -25,11 +71,19 @@ def content_node(state: AgentState) -> Dict[str, Any]:
     # Fetch relevant curriculum content from ChromaDB
     rag_context = ""
     try:
-        from app.core.rag import rag_system
-        # Query using the topic title + language
-        query = f"{topic} in {language}"
-        rag_context = rag_system.query_context(query, n_results=3)
-        print(f"DEBUG: Content RAG Context: {len(rag_context)} chars")
+        from app.core.rag import get_rag_system, static_context
+        from app.data.static_content import TOPIC_DATA
+        rag_system = get_rag_system(wait=False)
+        if rag_system is None:
+            # Still warming up (or failed): use the topic's own content
+            rag_context = static_context(topic, language)
+            print(f"DEBUG: RAG not ready, static context: {len(rag_context)} chars")
+        else:
+            # Query using the topic title + language
+            query = f"{topic} in {language}"
+            where = {"language": language.lower()} if language.lower() in TOPIC_DATA else None
+            rag_context = rag_system.query_context(query, n_results=3, where=where)
+            print(f"DEBUG: Content RAG Context: {len(rag_context)} chars")
     except Exception as e:
         print(f"WARNING: RAG Query Failed: {e}")
 
@@ -56,32 +110,25 @@ def content_node(state: AgentState) -> Dict[str, Any]:
     
     Do not include any preamble or postscript. Return only the Markdown content.
     """
+    return prompt
+
+def _clean_lesson(content_raw: str) -> str:
+    content_stripped = content_raw.strip()
     
-    content = ""
-    try:
-        content_raw = llm_client.generate(prompt)
-        content_stripped = content_raw.strip()
-        
-        # Remove markdown fences logic
-        if content_stripped.startswith("```markdown"):
-            content_stripped = content_stripped[11:]
-            if content_stripped.endswith("```"):
-                content_stripped = content_stripped[:-3]
-        elif content_stripped.startswith("```"):
-            content_stripped = content_stripped[3:]
-            if content_stripped.endswith("```"):
-                content_stripped = content_stripped[:-3]
-                
-        content = content_stripped.strip()
-        
-    except Exception as e:
-        print(f"ContentNode Error: {e}")
-        if "AI_QUOTA_EXCEEDED" in str(e):
-             content = "AI_QUOTA_EXCEEDED" # Signal to API to handle
-        else:
-             content = f"Error generating content: {e}"
+    # Remove markdown fences logic
+    if content_stripped.startswith("```markdown"):
+        content_stripped = content_stripped[11:]
+        if content_stripped.endswith("```"):
+            content_stripped = content_stripped[:-3]
+    elif content_stripped.startswith("```"):
+        content_stripped = content_stripped[3:]
+        if content_stripped.endswith("```"):
+            content_stripped = content_stripped[:-3]
+            
+    return content_stripped.strip()
 
-    return {
-        "payload": {"content": content},
-        "next_node": "end"
-    }
+def _lesson_error(e: Exception) -> str:
+    print(f"ContentNode Error: {e}")
+    if "AI_QUOTA_EXCEEDED" in str(e):
+         return "AI_QUOTA_EXCEEDED" # Signal to API to handle
+    return f"Error generating content: {e}"
@@ -1,6 +1,7 @@
 from typing import Dict, Any, List
 from app.core.state import AgentState
-from app.core.llm import llm_client
+from app.core.llm import llm_client, async_llm_client
+from app.core.rate_limit import LLMPriority
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 def interview_node(state: AgentState) -> Dict[str, Any]:
@@ -8,12 +9,54 @@ def interview_node(state: AgentState) -> Dict[str, Any]:
     Conducts a mock interview.
     """
     print("--- INTERVIEW NODE ---")
-    
+
+    try:
+        # Interview turns are conversational; never replay a cached answer
+        response = llm_client.chat_completion(
+            _build_llm_messages(state),
+            cache_ttl=0,
+            priority=LLMPriority.HIGH,
+            user=state.get("user_email")
+        )
+    except Exception as e:
+        print(f"InterviewNode Error: {e}")
+        response = "I'm having trouble connecting to the interview server. Please try again."
+        
+    return {
+        # We return the response as a NEW message to be added to state
+        "messages": [AIMessage(content=response)],
+        "next_node": "end"
+    }
+
+async def ainterview_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async variant of interview_node used by app_graph.ainvoke.
+    """
+    print("--- INTERVIEW NODE (async) ---")
+
+    try:
+        response = await async_llm_client.achat_completion(
+            _build_llm_messages(state),
+            cache_ttl=0,
+            priority=LLMPriority.HIGH,
+            user=state.get("user_email")
+        )
+    except Exception as e:
+        print(f"InterviewNode Error: {e}")
+        response = "I'm having trouble connecting to the interview server. Please try again."
+
+    return {
+        "messages": [AIMessage(content=response)],
+        "next_node": "end"
+    }
+
+def _build_llm_messages(state: AgentState) -> List[Dict[str, str]]:
     payload = state.get("payload", {})
     messages = state.get("messages", [])
     
     topic = payload.get("interview_topic", "General Coding")
     difficulty = payload.get("difficulty", "Medium")
+    history_summary = payload.get("history_summary", "")
     
     system_prompt = f"""
     You are an expert Technical Interviewer for a top-tier tech company.
@@ -37,6 +80,11 @@ def interview_node(state: AgentState) -> Dict[str, Any]:
     # If payload contains 'interview_topic', it's likely a start/setup request
     # But if there are already messages in history, it might be a continuation.
     
+    # Earlier turns are not replayed verbatim on long interviews; the API
+    # passes their running summary instead.
+    if history_summary:
+        system_prompt += f"\n    Summary of the interview so far:\n    {history_summary}\n"
+    
     # We construct the prompt for the LLM using the history
     llm_messages = [{"role": "system", "content": system_prompt}]
     
@@ -55,15 +103,5 @@ def interview_node(state: AgentState) -> Dict[str, Any]:
     if not messages and topic:
         # Implicit user intent
         llm_messages.append({"role": "user", "content": f"I am ready for my {topic} interview."})
-        
-    try:
-        response = llm_client.chat_completion(llm_messages)
-    except Exception as e:
-        print(f"InterviewNode Error: {e}")
-        response = "I'm having trouble connecting to the interview server. Please try again."
-        
-    return {
-        # We return the response as a NEW message to be added to state
-        "messages": [AIMessage(content=response)],
-        "next_node": "end"
-    }
+
+    return llm_messages
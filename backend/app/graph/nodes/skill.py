@@ -1,14 +1,46 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import json
 from app.core.state import AgentState
-from app.core.llm import llm_client
+from app.core.llm import llm_client, async_llm_client
+from app.core.rate_limit import LLMPriority
 
 def skill_node(state: AgentState) -> Dict[str, Any]:
     """
     Analyzes quiz results to generate a personalized learning path (syllabus).
     """
     print("--- SKILL NODE ---")
-    
+
+    prompt, topic_titles = _build_skill_prompt(state)
+    try:
+        response_text = llm_client.generate(prompt, priority=LLMPriority.NORMAL, user=state.get("user_email"))
+        ordered_topics = _parse_ordered_topics(response_text, topic_titles)
+    except Exception as e:
+        ordered_topics = _fallback_order(e, topic_titles)
+
+    return {
+        "payload": {"ordered_titles": ordered_topics},
+        "next_node": "end"
+    }
+
+async def askill_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async variant of skill_node used by app_graph.ainvoke.
+    """
+    print("--- SKILL NODE (async) ---")
+
+    prompt, topic_titles = _build_skill_prompt(state)
+    try:
+        response_text = await async_llm_client.agenerate(prompt, priority=LLMPriority.NORMAL, user=state.get("user_email"))
+        ordered_topics = _parse_ordered_topics(response_text, topic_titles)
+    except Exception as e:
+        ordered_topics = _fallback_order(e, topic_titles)
+
+    return {
+        "payload": {"ordered_titles": ordered_topics},
+        "next_node": "end"
+    }
+
+def _build_skill_prompt(state: AgentState) -> Tuple[str, List[str]]:
     payload = state.get("payload", {})
     # Extract inputs using keys expected from the API request
     quiz_results = payload.get("quiz_results", [])
@@ -36,31 +68,22 @@ def skill_node(state: AgentState) -> Dict[str, Any]:
     
     Return ONLY a JSON array of strings representing the reordered topics.
     """
+    return prompt, topic_titles
+
+def _parse_ordered_topics(response_text: str, topic_titles: List[str]) -> List[str]:
+    # Clean response
+    cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
+    ordered_topics = json.loads(cleaned_response)
     
-    ordered_topics = topic_titles # Default fallback
-    
-    try:
-        response_text = llm_client.generate(prompt)
-        # Clean response
-        cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
-        ordered_topics = json.loads(cleaned_response)
-        
-        # Validation
-        if not isinstance(ordered_topics, list):
-            print("SkillNode Warning: LLM returned non-list. Fallback to default.")
-            ordered_topics = topic_titles
-            
-    except Exception as e:
-        print(f"SkillNode Error: {e}")
-        # Fallback: reverse logic or keep same
-        if topic_titles:
-             ordered_topics = list(reversed(topic_titles))
-             
-    # Prepare output payload
-    # logic to re-attach original objects if we had dicts logic is handled in API layer usually, 
-    # but let's just return the ordered list for the API to process.
-    
-    return {
-        "payload": {"ordered_titles": ordered_topics},
-        "next_node": "end"
-    }
+    # Validation
+    if not isinstance(ordered_topics, list):
+        print("SkillNode Warning: LLM returned non-list. Fallback to default.")
+        ordered_topics = topic_titles
+    return ordered_topics
+
+def _fallback_order(e: Exception, topic_titles: List[str]) -> List[str]:
+    print(f"SkillNode Error: {e}")
+    # Fallback: reverse logic or keep same
+    if topic_titles:
+         return list(reversed(topic_titles))
+    return topic_titles
@@ -1,8 +1,15 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, Literal, Optional
 from app.core.state import AgentState
-from app.core.llm import llm_client
+from app.core.config import settings
+from app.core.llm import llm_client, async_llm_client
+from app.core.rate_limit import LLMPriority
+from app.graph.intent_router import intent_router
+import asyncio
 import json
 
+# Routing decisions depend only on the message text, so they can be reused for a day.
+ROUTING_CACHE_TTL = 24 * 60 * 60
+
 def supervisor_node(state: AgentState) -> Dict[str, Any]:
     """
     The Supervisor Node acts as the router.
@@ -10,7 +17,78 @@ def supervisor_node(state: AgentState) -> Dict[str, Any]:
     and determines the 'next_node'.
     """
     print("--- SUPERVISOR NODE ---")
-    
+
+    next_node = _route_without_llm(state)
+    if next_node:
+        return {"next_node": next_node}
+
+    text = _last_message_text(state)
+    decision = intent_router.classify(text) if settings.INTENT_ROUTER_ENABLED else None
+    if decision and intent_router.is_confident(decision):
+        return _accept_local_decision(text, decision)
+
+    try:
+        response_text = llm_client.generate(
+            _routing_prompt(state),
+            cache_ttl=ROUTING_CACHE_TTL,
+            priority=LLMPriority.LOW,
+            user=state.get("user_email")
+        )
+        next_node = _parse_routing_response(response_text)
+        if decision:
+            intent_router.record(text, decision, llm_intent=next_node)
+    except Exception as e:
+        # The router's low-confidence guess still beats a blind default
+        next_node = decision.intent if decision else "chat"
+        print(f"Supervisor LLM Error: {e}. Fallback to '{next_node}'.")
+        
+    print(f"Supervisor: Routing to {next_node}")
+    return {"next_node": next_node}
+
+async def asupervisor_node(state: AgentState) -> Dict[str, Any]:
+    """
+    Async variant of supervisor_node used by app_graph.ainvoke.
+    """
+    print("--- SUPERVISOR NODE (async) ---")
+
+    next_node = _route_without_llm(state)
+    if next_node:
+        return {"next_node": next_node}
+
+    text = _last_message_text(state)
+    # Embedding the message is CPU bound, keep it off the event loop
+    decision = await asyncio.to_thread(intent_router.classify, text) if settings.INTENT_ROUTER_ENABLED else None
+    if decision and intent_router.is_confident(decision):
+        return _accept_local_decision(text, decision)
+
+    try:
+        response_text = await async_llm_client.agenerate(
+            _routing_prompt(state),
+            cache_ttl=ROUTING_CACHE_TTL,
+            priority=LLMPriority.LOW,
+            user=state.get("user_email")
+        )
+        next_node = _parse_routing_response(response_text)
+        if decision:
+            intent_router.record(text, decision, llm_intent=next_node)
+    except Exception as e:
+        # The router's low-confidence guess still beats a blind default
+        next_node = decision.intent if decision else "chat"
+        print(f"Supervisor LLM Error: {e}. Fallback to '{next_node}'.")
+
+    print(f"Supervisor: Routing to {next_node}")
+    return {"next_node": next_node}
+
+def _accept_local_decision(text: str, decision) -> Dict[str, Any]:
+    intent_router.record(text, decision)
+    print(f"Supervisor: Routing to {decision.intent} ({decision.source}, confidence={decision.confidence:.2f}, {decision.latency_ms:.2f}ms)")
+    return {"next_node": decision.intent}
+
+def _route_without_llm(state: AgentState) -> Optional[str]:
+    """
+    Resolves the route from the payload or obvious keywords.
+    Returns None when the LLM has to classify the message.
+    """
     messages = state.get("messages", [])
     payload = state.get("payload", {})
     
@@ -23,33 +101,39 @@ def supervisor_node(state: AgentState) -> Dict[str, Any]:
         
         if "quiz_results" in payload:
             print("Supervisor: Routing to SkillNode (Payload has quiz_results)")
-            return {"next_node": "skill"}
+            return "skill"
             
         if "topic_id" in payload:
             print("Supervisor: Routing to ContentNode (Payload has topic_id)")
-            return {"next_node": "content"}
+            return "content"
             
         if "submission" in payload:
             print("Supervisor: Routing to EvaluatorNode (Payload has submission)")
-            return {"next_node": "evaluate"}
+            return "evaluate"
             
         if "interview_topic" in payload:
             print("Supervisor: Routing to InterviewNode (Payload has interview_topic)")
-            return {"next_node": "interview"}
+            return "interview"
 
     # 2. Analyze Chat Message (Implicit routing)
     if not messages:
         # No messages and no recognizable payload? End.
-        return {"next_node": "end"}
+        return "end"
         
-    last_message = messages[-1]
-    content = last_message.content if hasattr(last_message, "content") else str(last_message)
+    content = _last_message_text(state)
     
     # Simple heuristic fallback (faster than LLM for obvious keywords)
     content_lower = content.lower()
     if "interview" in content_lower and "start" in content_lower:
-         return {"next_node": "interview"}
-         
+         return "interview"
+
+    return None
+
+def _last_message_text(state: AgentState) -> str:
+    last_message = state.get("messages", [])[-1]
+    return last_message.content if hasattr(last_message, "content") else str(last_message)
+
+def _routing_prompt(state: AgentState) -> str:
     # 3. LLM Routing (The "Brain")
     # We ask the LLM to classify the intent.
     system_prompt = """
@@ -65,17 +149,10 @@ def supervisor_node(state: AgentState) -> Dict[str, Any]:
     Return ONLY a JSON object: {"next_node": "..."}
     """
     
-    routing_prompt = f"{system_prompt}\n\nUser Message: {content}"
-    
-    try:
-        response_text = llm_client.generate(routing_prompt)
-        # Clean response (remove backticks if any)
-        cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
-        data = json.loads(cleaned_response)
-        next_node = data.get("next_node", "chat")
-    except Exception as e:
-        print(f"Supervisor LLM Error: {e}. Fallback to 'chat'.")
-        next_node = "chat"
-        
-    print(f"Supervisor: Routing to {next_node}")
-    return {"next_node": next_node}
+    return f"{system_prompt}\n\nUser Message: {_last_message_text(state)}"
+
+def _parse_routing_response(response_text: str) -> str:
+    # Clean response (remove backticks if any)
+    cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
+    data = json.loads(cleaned_response)
+    return data.get("next_node", "chat")
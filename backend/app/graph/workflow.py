@@ -1,22 +1,25 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from app.core.state import AgentState
-from app.graph.nodes.supervisor import supervisor_node
-from app.graph.nodes.chat import chat_node
-from app.graph.nodes.skill import skill_node
-from app.graph.nodes.content import content_node
+from app.graph.nodes.supervisor import supervisor_node, asupervisor_node
+from app.graph.nodes.chat import chat_node, achat_node
+from app.graph.nodes.skill import skill_node, askill_node
+from app.graph.nodes.content import content_node, acontent_node
 from app.graph.nodes.evaluator import evaluator_node
-from app.graph.nodes.interview import interview_node
+from app.graph.nodes.interview import interview_node, ainterview_node
 
 # Define the graph
 workflow = StateGraph(AgentState)
 
 # Add Nodes
-workflow.add_node("supervisor", supervisor_node)
-workflow.add_node("chat", chat_node)
-workflow.add_node("skill", skill_node)
-workflow.add_node("content", content_node)
+# LLM-backed nodes carry both implementations: app_graph.invoke runs the sync
+# function, app_graph.ainvoke awaits the async one without blocking the loop.
+workflow.add_node("supervisor", RunnableLambda(supervisor_node, afunc=asupervisor_node))
+workflow.add_node("chat", RunnableLambda(chat_node, afunc=achat_node))
+workflow.add_node("skill", RunnableLambda(skill_node, afunc=askill_node))
+workflow.add_node("content", RunnableLambda(content_node, afunc=acontent_node))
 workflow.add_node("evaluate", evaluator_node)
-workflow.add_node("interview", interview_node)
+workflow.add_node("interview", RunnableLambda(interview_node, afunc=ainterview_node))
 
 # Add Edges
 # Entry point
@@ -1,7 +1,31 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="AI Learning Platform API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.config import settings
+    from app.core.session_store import interview_sessions, sweep_periodically
+    from app.execution.engine import execution_backend
+    from app.core import rag
+
+    # Pre-start execution workers (warm Python pool for the local sandbox)
+    await asyncio.to_thread(execution_backend.warm_up)
+
+    # Embedding model + Chroma load in a background thread; startup does not wait
+    if settings.RAG_WARM_UP_ON_STARTUP:
+        rag.start_warm_up()
+
+    # Background maintenance tasks, cancelled on shutdown
+    tasks = [
+        asyncio.create_task(sweep_periodically(interview_sessions, settings.SESSION_SWEEP_INTERVAL_SECONDS))
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+
+app = FastAPI(title="AI Learning Platform API", lifespan=lifespan)
 
 # CORS configuration
 origins = [
@@ -70,3 +94,8 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics")
+def read_metrics():
+    from app.core import metrics
+    return metrics.snapshot()
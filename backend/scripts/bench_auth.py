@@ -0,0 +1,43 @@
+import sys
+import os
+import argparse
+import timeit
+
+# Add backend to path (assuming scripts/ is inside backend/)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core import security
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    per_call_us = seconds / number * 1e6
+    print(f"{label:<28} {per_call_us:10.2f} us/call  ({number / seconds:,.0f} calls/s)")
+    return per_call_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark of JWT verification with and without the claims cache.")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct tokens cycled through (simulated users)")
+    args = parser.parse_args()
+
+    tokens = [security.create_access_token({"sub": f"user{i}@example.com"}) for i in range(args.tokens)]
+    state = {"i": 0}
+
+    def next_token():
+        state["i"] = (state["i"] + 1) % len(tokens)
+        return tokens[state["i"]]
+
+    uncached = bench(
+        "jwt.decode (uncached)",
+        lambda: security.jwt.decode(next_token(), settings.SECRET_KEY, algorithms=[settings.ALGORITHM]),
+        args.number
+    )
+    # Warm the cache, then measure the hit path
+    for token in tokens:
+        security.decode_access_token(token)
+    cached = bench("decode_access_token (cached)", lambda: security.decode_access_token(next_token()), args.number)
+
+    print(f"Speedup: {uncached / cached:.1f}x  cache: {security._token_cache.stats()}")
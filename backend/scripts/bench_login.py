@@ -0,0 +1,61 @@
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add backend to path (assuming scripts/ is inside backend/)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core import security
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01):
+    """
+    Stands in for unrelated endpoints: measures how late the event loop wakes up.
+    """
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+async def run(label, verify, hashed, concurrency, logins):
+    async def worker(count):
+        for _ in range(count):
+            await verify("correct horse battery staple", hashed)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    per_worker = max(1, logins // concurrency)
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_lag = await probe
+
+    total = per_worker * concurrency
+    print(f"{label:<12} {total / elapsed:8.1f} logins/s   worst event-loop lag {worst_lag * 1000:8.1f} ms")
+
+
+async def inline_verify(plain, hashed):
+    # What the login endpoint did before: bcrypt on the event loop
+    return security.verify_password(plain, hashed)
+
+
+async def main(args):
+    hashed = security.get_password_hash("correct horse battery staple")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS} workers={settings.PASSWORD_HASH_WORKERS} concurrency={args.concurrency}")
+    await run("inline", inline_verify, hashed, args.concurrency, args.logins)
+    await run("offloaded", security.averify_password, hashed, args.concurrency, args.logins)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login throughput and event-loop responsiveness under concurrent bcrypt checks.")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="Simultaneous logins")
+    parser.add_argument("-n", "--logins", type=int, default=128, help="Total logins per run")
+    asyncio.run(main(parser.parse_args()))
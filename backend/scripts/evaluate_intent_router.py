@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+import argparse
+
+# Add backend to path (assuming scripts/ is inside backend/)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+
+
+def load_entries(path):
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def evaluate(entries, thresholds):
+    """
+    Uses decisions the LLM made (llm_intent) or hand labels ("label") as ground
+    truth, and reports how the local router would have done at each threshold.
+    """
+    labelled = [e for e in entries if e.get("label") or e.get("llm_intent")]
+    if not labelled:
+        print("No labelled decisions yet. Lower INTENT_ROUTER_THRESHOLD or add 'label' fields.")
+        return
+
+    print(f"Decisions: {len(entries)} total, {len(labelled)} labelled")
+    print(f"{'threshold':>10} {'coverage':>10} {'accuracy':>10}")
+    for threshold in thresholds:
+        covered = [e for e in labelled if e["confidence"] >= threshold]
+        correct = [e for e in covered if e["router_intent"] == (e.get("label") or e["llm_intent"])]
+        coverage = len(covered) / len(labelled)
+        accuracy = len(correct) / len(covered) if covered else 0.0
+        print(f"{threshold:>10.2f} {coverage:>10.1%} {accuracy:>10.1%}")
+
+    latencies = sorted(e.get("latency_ms", 0) for e in entries)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"Router latency: p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline accuracy report for the supervisor intent router.")
+    parser.add_argument("log", nargs="?", default=settings.INTENT_DECISION_LOG_PATH, help="Path to the JSONL decision log")
+    args = parser.parse_args()
+
+    if not args.log or not os.path.exists(args.log):
+        print("Decision log not found. Set INTENT_DECISION_LOG_PATH or pass a path.")
+        sys.exit(1)
+
+    evaluate(load_entries(args.log), [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9])
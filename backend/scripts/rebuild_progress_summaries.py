@@ -0,0 +1,33 @@
+import sys
+import os
+import argparse
+
+# Add backend to path (assuming scripts/ is inside backend/)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.crud.progress_summary import progress_summary
+
+
+def rebuild(user_ids):
+    """
+    Regenerates progressSummaries docs from raw topicProgress docs.
+    With no user IDs, every user that has progress is rebuilt.
+    """
+    if not user_ids:
+        docs = progress_summary.db.collection("topicProgress").select(["user_id"]).stream()
+        user_ids = sorted({doc.to_dict().get("user_id") for doc in docs} - {None})
+
+    print(f"Rebuilding {len(user_ids)} progress summaries in project: {settings.FIRESTORE_PROJECT_ID}")
+    for user_id in user_ids:
+        summary = progress_summary.rebuild(user_id)
+        totals = summary["totals"]
+        print(f"  {user_id}: attempted={totals['attempted']} mastered={totals['mastered']} weak={totals['weak']}")
+    print("Rebuild Complete.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill or repair the per-user progress aggregates.")
+    parser.add_argument("users", nargs="*", help="User emails to rebuild (default: all users with progress)")
+    args = parser.parse_args()
+    rebuild(args.users)
@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+
+# Add backend to path (assuming scripts/ is inside backend/)
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core.rag import RAGSystem
+
+
+def sync(batch_size, dry_run):
+    """
+    Re-embeds only the course content chunks that changed since the last sync
+    and deletes the ones that were removed from static_content.py.
+    """
+    rag = RAGSystem(
+        sync=False,
+        batch_size=batch_size,
+        chunk_tokens=settings.RAG_CHUNK_TOKENS,
+        chunk_overlap_tokens=settings.RAG_CHUNK_OVERLAP_TOKENS
+    )
+
+    def report_progress(done, total):
+        print(f"  embedded {done}/{total} chunks")
+
+    report = rag.sync(progress=report_progress, dry_run=dry_run)
+    prefix = "Would sync" if dry_run else "Synced"
+    print(f"{prefix}: {report['upserted']} upserted, {report['deleted']} deleted, {report['unchanged']} unchanged.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync TOPIC_DATA into the Chroma course_content collection.")
+    parser.add_argument("--batch-size", type=int, default=settings.RAG_EMBED_BATCH_SIZE, help="Chunks embedded per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    sync(args.batch_size, args.dry_run)
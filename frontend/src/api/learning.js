@@ -48,11 +48,12 @@ export const resetLearningPath = async (language, level) => {
     }
 };
 
-export const submitTopicQuiz = async (language, topicId, submission, totalQuestions) => {
+export const submitTopicQuiz = async (language, topicId, submission, totalQuestions, level = null) => {
     try {
         const response = await axios.post(`/learning/topic/${language}/${topicId}/submit`, {
             submission,
-            totalQuestions
+            totalQuestions,
+            level
         });
         return response.data;
     } catch (error) {
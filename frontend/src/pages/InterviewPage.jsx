@@ -68,7 +68,8 @@ const InterviewPage = () => {
         if (voiceMode && !ws.current) {
             // Connect
             const clientId = Date.now().toString();
-            const wsUrl = `ws://localhost:8000/api/v1/ws/ws/${clientId}`;
+            const token = encodeURIComponent(localStorage.getItem('token') || '');
+            const wsUrl = `ws://localhost:8000/api/v1/ws/ws/${clientId}?token=${token}`;
             const socket = new WebSocket(wsUrl);
 
             socket.onopen = () => {
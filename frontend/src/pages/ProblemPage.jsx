@@ -119,16 +119,18 @@ const ProblemPage = () => {
                                 <div>
                                     <h3 className={`text-base font-black flex items-center gap-2 ${submissionResult.status === 'Accepted' ? 'text-green-700' : 'text-red-700'
                                         }`}>
-                                        {submissionResult.status === 'Accepted' ? '🎉 Accepted' : '❌ Wrong Answer'}
+                                        {submissionResult.status === 'Accepted' ? '🎉 Accepted' : `❌ ${submissionResult.status || 'Wrong Answer'}`}
                                     </h3>
                                     {submissionResult.status === 'Accepted' && (
                                         <div className="flex gap-3 text-xs text-green-700/80 font-bold mt-0.5">
                                             <span>✅ {submissionResult.passed_tests}/{submissionResult.total_tests} Tests Passed</span>
                                             <span>⏱️ {submissionResult.runtime}</span>
+                                            {submissionResult.memory && <span>💾 {submissionResult.memory}</span>}
                                         </div>
                                     )}
                                     {submissionResult.status !== 'Accepted' && (
-                                        <div className="text-xs text-red-600 mt-0.5 font-medium">
+                                        <div className="text-xs text-red-600 mt-0.5 font-medium whitespace-pre-wrap max-h-32 overflow-y-auto">
+                                            {submissionResult.passed_tests !== undefined && `${submissionResult.passed_tests}/${submissionResult.total_tests} passed · `}
                                             {submissionResult.message || "Logic verification failed."}
                                         </div>
                                     )}
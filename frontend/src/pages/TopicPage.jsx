@@ -61,7 +61,13 @@ const TopicPage = () => {
 
         try {
             setSubmitting(true);
-            const result = await submitTopicQuiz(language, topicId, submissionPayload, topicContent.quiz.length);
+            const result = await submitTopicQuiz(
+                language,
+                topicId,
+                submissionPayload,
+                topicContent.quiz.length,
+                localStorage.getItem(`lastLevel_${language}`)
+            );
             setEvaluationResult(result);
         } catch (err) {
             console.error(err);